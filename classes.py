@@ -1,14 +1,39 @@
-from typing import Union
+from typing import Optional, Union
+from contextvars import ContextVar, Token
+from contextlib import contextmanager
 
+from type_enums import NodeType, EdgeType, BlockType, LinkType
 from knowledge.implementations.graph import Graph
 from knowledge.implementations.edge import Edge
 from knowledge.implementations.node import Node
 from content.implementations.link import Link
 from content.implementations.block import Block
+from content.implementations.page import Page
+from knowledge.implementations.edge_store import ColumnarEdgeStore
+
+
+DEFAULT_GRAPH = Graph()
+CURRENT_GRAPH = ContextVar('current_graph', default=DEFAULT_GRAPH)
 
 
 def get_graph() -> Graph:
-    return Graph()
+    return CURRENT_GRAPH.get()
+
+
+def set_graph(graph: Graph) -> Token:
+    assert isinstance(graph, Graph), 'expected Graph, got {}'.format(graph)
+    return CURRENT_GRAPH.set(graph)
+
+
+@contextmanager
+def graph_context(graph: Optional[Graph] = None):
+    if graph is None:
+        graph = Graph()
+    token = set_graph(graph)
+    try:
+        yield graph
+    finally:
+        CURRENT_GRAPH.reset(token)
 
 
 def clear_graph():
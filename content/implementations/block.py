@@ -1,12 +1,14 @@
 from typing import Optional, Generator, Iterable, Union
+import json
+import sys
 
 try:  # Assume we're a submodule in a package.
-    from utils import get_canonic_synonym
+    from utils import get_canonic_synonym, get_compiled_synonyms, get_escaped_html, MIN_ITEMS_FOR_SET
     from interfaces import NodeInterface, BlockInterface, LinkInterface
     import type_enums as te
     import classes as cs
 except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
-    from ...utils import get_canonic_synonym
+    from ...utils import get_canonic_synonym, get_compiled_synonyms, get_escaped_html, MIN_ITEMS_FOR_SET
     from ...interfaces import NodeInterface, BlockInterface, LinkInterface
     from ... import type_enums as te
     from ... import classes as cs
@@ -25,9 +27,31 @@ BLOCK_KEYS_SYNONYMS = (
     ('items', 'node', 'node', 'nodes', 'content', 'list', 'struct'),
     ('anchor', 'bookmark'),
 )
+BLOCK_KEYS = get_compiled_synonyms(BLOCK_KEYS_SYNONYMS)
+HTML_BLOCK_TAGS = {  # block type: (opening tag, item template, closing tag)
+    te.BlockType.Title: ('<header>', '<h1>{}</h1>', '</header>'),
+    te.BlockType.Struct: ('<ul>', '<li>{}</li>', '</ul>'),
+    te.BlockType.Info: ('', '<p>{}</p>', ''),
+    te.BlockType.Props: ('<ul>', '<li>{}</li>', '</ul>'),
+    te.BlockType.Image: ('', '<img src="{}">', ''),
+    te.BlockType.Links: ('<ul>', '<li>{}</li>', '</ul>'),
+}
+HTML_BLOCK_TEMPLATES = {  # compiled once: (opening template for anchor and title, item template, closing tags)
+    t: (
+        '<section class="block {}"{{}}>{{}}{}'.format(t.value, opening_tag).format,
+        item_template.format,
+        '{}</section>'.format(closing_tag),
+    )
+    for t, (opening_tag, item_template, closing_tag) in HTML_BLOCK_TAGS.items()
+}
+HTML_BLOCK_TITLE_TEMPLATE = '<h2>{}</h2>'.format
+HTML_ANCHOR_TEMPLATE = ' id="{}"'.format
+HTML_PROP_TEMPLATE = '<b>{}</b>: {}'.format
 
 
 class Block(BlockInterface):
+    __slots__ = ('_title', '_block_type', '_items', '_item_set', '_anchor')
+
     def __init__(
             self,
             title: Optional[str] = None,
@@ -45,13 +69,14 @@ class Block(BlockInterface):
         self._block_type = block_type
         assert isinstance(items, list) or items is None
         self._items = items or list()
+        self._item_set = None
         self._anchor = anchor
 
     @staticmethod
     def from_dict(obj: dict) -> BlockInterface:
         block = Block()
         for k, v in obj.items():
-            k = get_canonic_synonym(k, BLOCK_KEYS_SYNONYMS, class_name='Block')
+            k = get_canonic_synonym(k, BLOCK_KEYS, class_name='Block')
             if k == 'title' and v:
                 block.set_title(v)
             if k == 'type' and v:
@@ -100,8 +125,59 @@ class Block(BlockInterface):
         elif self.get_block_type() in (cs.BlockType.Struct, cs.BlockType.Links):
             assert isinstance(item, cs.Link)
         self._items.append(item)
+        self.add_item_to_set(item)
+        return self
+
+    def add_item_to_set(self, item: ItemInterface) -> Native:
+        if self._item_set is not None:
+            try:
+                self._item_set.add(item)
+            except TypeError:  # unhashable items (i.e. dict) are checked by list scan in has_item()
+                pass
+        return self
+
+    def get_item_set(self) -> Optional[set]:
+        if self._item_set is None and len(self._items) >= MIN_ITEMS_FOR_SET:
+            self._item_set = set()
+            for item in self._items:
+                self.add_item_to_set(item)
+        return self._item_set
+
+    def reset_item_set(self) -> Native:  # hashes of links are changed on rename of their nodes
+        self._item_set = None
         return self
 
+    def has_item(self, item: ItemInterface) -> bool:
+        item_set = self.get_item_set()
+        if item_set is None:
+            return item in self._items
+        try:
+            return item in item_set
+        except TypeError:
+            return item in self._items
+
+    def get_fingerprint_parts(self) -> Generator:
+        yield 'block'
+        yield self.get_block_type().value
+        yield self.get_title() or ''
+        yield self.get_anchor() or ''
+        for item in self.get_items():
+            if isinstance(item, cs.Link):
+                yield 'link'
+                yield from item.get_fingerprint_parts()
+            elif isinstance(item, str):
+                yield 'text'
+                yield item
+            else:
+                yield 'struct'
+                yield json.dumps(item, sort_keys=True, default=str)
+
+    def get_memory_size(self) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(self._items)
+        if self._item_set is not None:
+            size += sys.getsizeof(self._item_set)
+        return size
+
     def merge_block(self, block: BlockInterface) -> Native:
         assert isinstance(block, cs.Block)
         assert block.get_block_type() == self.get_block_type()
@@ -110,10 +186,13 @@ class Block(BlockInterface):
         if block.get_anchor():
             self.set_anchor(block.get_anchor())
         for item in block.get_items():
-            if item not in self.get_items():
+            if not self.has_item(item):
                 self.append_item(item)
         return self
 
+    def copy(self) -> Native:
+        return Block(self.get_title(), self.get_block_type(), items=list(self.get_items()), anchor=self.get_anchor())
+
     def get_content_count(self):
         return len(self.get_items())
 
@@ -156,11 +235,53 @@ class Block(BlockInterface):
                 assert isinstance(item, (NodeInterface, LinkInterface)), 'got {}'.format(item)
                 yield from item.get_text()
 
-    def get_markdown(self):
-        raise NotImplemented
+    def get_markdown(self) -> Generator:
+        block_type = self.get_block_type()
+        title = self.get_title()
+        if title and block_type != cs.BlockType.Title:
+            yield '## {}'.format(title)
+            yield ''
+        if block_type == cs.BlockType.Title:
+            for item in self.get_items():
+                yield '# {}'.format(item)
+        elif block_type == cs.BlockType.Info:
+            for item in self.get_items():
+                yield item
+                yield ''
+            return
+        elif block_type == cs.BlockType.Image:
+            for item in self.get_items():
+                yield '![{}]({})'.format(title or '', item)
+        else:
+            for item in self.get_items():
+                if isinstance(item, cs.Link):
+                    yield '- {}'.format(item.get_markdown_line())
+                elif isinstance(item, dict):
+                    for k, v in item.items():
+                        yield '- **{}**: {}'.format(k, v)
+                else:
+                    yield '- {}'.format(item)
+        yield ''
 
-    def get_html(self):
-        raise NotImplemented
+    def get_html(self) -> Generator:
+        get_opening, get_item, closing = HTML_BLOCK_TEMPLATES[self.get_block_type()]
+        anchor = self.get_anchor()
+        title = self.get_title()
+        anchor_html = HTML_ANCHOR_TEMPLATE(get_escaped_html(anchor)) if anchor else ''
+        if title and self.get_block_type() != cs.BlockType.Title:
+            title_html = HTML_BLOCK_TITLE_TEMPLATE(get_escaped_html(title))
+        else:
+            title_html = ''
+        yield get_opening(anchor_html, title_html)
+        for item in self.get_items():
+            if isinstance(item, cs.Link):
+                yield get_item(item.get_html_line())
+            elif isinstance(item, dict):
+                for k, v in item.items():
+                    yield get_item(HTML_PROP_TEMPLATE(get_escaped_html(str(k)), get_escaped_html(str(v))))
+            else:
+                yield get_item(get_escaped_html(str(item)))
+        yield closing
 
     def __repr__(self):
         return 'Block("{}", type={}, anchor={}, {} items)'.format(
@@ -1,11 +1,14 @@
-from typing import Optional, Union
+from typing import Optional, Union, Generator
+import sys
 
 try:  # Assume we're a submodule in a package.
+    from utils import get_page_filename, get_escaped_html
     from interfaces import GraphInterface, NodeInterface, EdgeInterface, LinkInterface, BlockInterface
     import type_enums as te
     import classes as cs
     import builders as bs
 except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...utils import get_page_filename, get_escaped_html
     from ...interfaces import GraphInterface, NodeInterface, EdgeInterface, LinkInterface, BlockInterface
     from ... import type_enums as te
     from ... import classes as cs
@@ -13,10 +16,19 @@ except ImportError:  # Apparently no higher-level package has been imported, fal
 
 Native = LinkInterface
 Name = str
+Title = str
 Caption = str
 
+MARKDOWN_ESCAPE_TABLE = str.maketrans({'[': '\\[', ']': '\\]'})
+HTML_LINK_TEMPLATES = {
+    t: '<a class="link {}" href="{{}}">{{}}</a>'.format(t.value).format
+    for t in te.LinkType
+}
+
 
 class Link(LinkInterface):
+    __slots__ = ('_edge', '_is_from_b', '_caption', '_is_external', '_key')
+
     def __init__(
             self,
             edge: EdgeInterface,
@@ -34,6 +46,23 @@ class Link(LinkInterface):
         self._caption = caption
         assert isinstance(is_external, bool)
         self._is_external = is_external
+        self._key = None
+
+    def get_key(self) -> tuple:
+        key = self._key
+        if key is None:  # cached, so that hash stays stable while the link is in a set
+            key = self.get_source_name(), self.get_target_name(), self.get_type(), self.get_caption(), self.is_external()
+            self._key = key
+        return key
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Link):
+            return self.get_key() == other.get_key()
+        else:
+            return False
+
+    def __hash__(self):
+        return hash(self.get_key())
 
     @classmethod
     def build_edge(
@@ -49,7 +78,12 @@ class Link(LinkInterface):
             item_a, item_b = to_node, from_node
         else:
             item_a, item_b = from_node, to_node
-        return cs.Edge(item_a, item_b, edge_type, register=register)
+        graph = cls.get_graph_for(from_node)
+        if graph.is_sharing_edges() and isinstance(item_a, cs.Node) and isinstance(item_b, cs.Node):
+            shared_edge = graph.get_edge(item_a.get_name(), item_b.get_name(), edge_type)
+            if shared_edge:
+                return shared_edge
+        return cs.Edge(item_a, item_b, edge_type, register=register, graph=graph)
 
     @classmethod
     def build_link_from_nodes(
@@ -63,8 +97,9 @@ class Link(LinkInterface):
     ) -> LinkInterface:
         assert to_node, (from_node, to_node, link_type, caption)
         link_type = te.LinkType.get_type(link_type)
-        from_node = cls.get_graph().get_node(from_node) or from_node
-        to_node = cls.get_graph().get_node(to_node) or to_node
+        graph = cls.get_graph_for(from_node)
+        from_node = graph.get_node(from_node) or from_node
+        to_node = graph.get_node(to_node) or to_node
         edge = cls.build_edge(from_node, to_node, link_type)
         is_from_b = link_type.get_direction()
         return cs.Link(
@@ -82,20 +117,27 @@ class Link(LinkInterface):
             link_type: Union[te.LinkType, str, None] = None,
             update_nodes: bool = True,
             create_nodes: bool = True,
+            resolve_closest: Optional[bool] = None,
     ) -> LinkInterface:
         caption = obj.pop('caption', None) or obj.get('title') or obj.get('name') or obj.get('id')
         link_type = obj.pop('type', None) or link_type
         remaining_dict = obj.copy()
         target_name = remaining_dict.pop('id', None) or remaining_dict.pop('name', None) or obj.get('title')
-        target_node = cls.get_graph().get_node(target_name)
+        graph = cls.get_graph_for(from_node)
+        if resolve_closest is None:
+            resolve_closest = graph.is_resolving_closest()
+        if resolve_closest and target_name:
+            target_node = graph.get_closest_node(target_name)
+        else:
+            target_node = graph.get_node(target_name)
         target_exists = target_node is not None
         if target_exists:
             assert isinstance(target_node, NodeInterface), 'got {}'.format(target_node)
             has_content = bool(remaining_dict)
             if has_content and update_nodes:
-                target_node.add_from_dict(obj)
+                target_node.add_from_dict(remaining_dict if resolve_closest else obj)  # id of closest node is kept
         elif create_nodes:
-            target_node = cs.Node.build_node_from_dict(obj)
+            target_node = cs.Node.build_node_from_dict(obj, graph=graph)
         else:
             raise ValueError('node {} not exists (and option create_nodes=False used): {}'.format(target_name, obj))
         return cls.build_link_from_nodes(
@@ -106,8 +148,14 @@ class Link(LinkInterface):
         )
 
     @staticmethod
-    def get_graph() -> GraphInterface:
-        return cs.get_graph()
+    def get_graph_for(node: Union[NodeInterface, Name, None]) -> GraphInterface:
+        if isinstance(node, cs.Node):
+            return node.get_graph()
+        else:
+            return cs.get_graph()
+
+    def get_graph(self) -> GraphInterface:
+        return self.get_edge().get_graph()
 
     def get_edge(self) -> EdgeInterface:
         return self._edge
@@ -118,8 +166,14 @@ class Link(LinkInterface):
     def get_caption(self) -> Caption:
         return self._caption
 
+    def is_external(self) -> bool:
+        return self._is_external
+
     def copy(self) -> LinkInterface:
-        return cs.Link(edge=self.get_edge().copy(), is_from_b=self.is_from_b(), caption=self.get_caption())
+        edge = self.get_edge()
+        if not edge.get_graph().is_sharing_edges():
+            edge = edge.copy()
+        return cs.Link(edge=edge, is_from_b=self.is_from_b(), caption=self.get_caption())
 
     def get_source_node(self) -> NodeInterface:
         if self.is_from_b():
@@ -151,11 +205,32 @@ class Link(LinkInterface):
         edge = self.build_edge(self.get_source_node(), self.get_target_node(), link_type, register=True)
         return self.reset_edge(edge)
 
+    def set_edge(self, edge: EdgeInterface) -> Native:
+        assert edge.get_name_tuple() == self.get_edge().get_name_tuple(), 'got {}'.format(edge)
+        self._edge = edge
+        return self
+
     def reset_edge(self, edge: EdgeInterface) -> Native:
         self.get_edge().drop()
         self._edge = edge
+        return self.reset_key()
+
+    def reset_key(self) -> Native:
+        self._key = None
         return self
 
+    def get_fingerprint_parts(self) -> Generator:
+        yield self.get_target_name()
+        yield self.get_type().value
+        yield self.get_caption() or ''
+        yield 'external' if self.is_external() else 'internal'
+
+    def get_memory_size(self) -> int:
+        size = sys.getsizeof(self)
+        if self._key is not None:
+            size += sys.getsizeof(self._key)
+        return size
+
     def is_hidden(self) -> bool:
         return self.get_target_node().is_hidden()
 
@@ -164,8 +239,31 @@ class Link(LinkInterface):
         assert isinstance(node, NodeInterface)
         yield '({}) {}'.format(node.get_name(), self.get_caption() if self.get_caption() else node.get_main_title())
 
+    def get_target_title(self) -> Title:
+        caption = self.get_caption()
+        if caption:
+            return caption
+        name = self.get_target_name()
+        node = self.get_graph().get_node_by_name(name) or self.get_target_node()
+        titles = node.get_titles()
+        return titles[0] if titles else name
+
+    def get_url(self, extension: str = 'md') -> str:
+        name = self.get_target_name()
+        if self.is_external():
+            return name
+        else:
+            return get_page_filename(name, extension)
+
+    def get_markdown_line(self) -> str:
+        return '[{}]({})'.format(self.get_target_title().translate(MARKDOWN_ESCAPE_TABLE), self.get_url())
+
     def get_markdown(self):
-        raise NotImplemented
+        yield self.get_markdown_line()
+
+    def get_html_line(self) -> str:
+        template = HTML_LINK_TEMPLATES[self.get_type()]
+        return template(get_escaped_html(self.get_url('html')), get_escaped_html(self.get_target_title()))
 
     def get_html(self):
-        raise NotImplemented
+        yield self.get_html_line()
@@ -1,14 +1,37 @@
+from typing import Optional, Generator, Iterable, TextIO
+import hashlib
+
 try:  # Assume we're a submodule in a package.
+    from utils import get_escaped_html
     from interfaces import GraphInterface, NodeInterface, EdgeInterface, LinkInterface, BlockInterface, PageInterface
     import type_enums as te
     import classes as cs
     import builders as bs
 except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...utils import get_escaped_html
     from ...interfaces import GraphInterface, NodeInterface, EdgeInterface, LinkInterface, BlockInterface, PageInterface
     from ... import type_enums as te
     from ... import classes as cs
     from ... import builders as bs
 
+NAVIG_LINK_TYPE = te.LinkType.Parent
+LINK_TYPES_BY_EDGE_TYPE_VALUE = {t.value: t.get_link_types() for t in te.EdgeType}
+HTML_PAGE_HEADER_TEMPLATE = '<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>{}</title></head>\n<body>'.format
+HTML_PAGE_FOOTER = '</body>\n</html>'
+RENDER_VERSION = 1  # bumped when markdown or html rendering changes, so exported pages are rendered again
+FINGERPRINT_SIZE = 16
+FINGERPRINT_SEPARATOR = '\x00'
+
+
+def write_lines(sink: TextIO, lines: Iterable) -> int:
+    write = sink.write
+    count = 0
+    for line in lines:
+        write(line)
+        write('\n')
+        count += 1
+    return count
+
 
 class Page(PageInterface):
     def __init__(
@@ -18,23 +41,83 @@ class Page(PageInterface):
         assert isinstance(item, cs.Node)
         self.item = item
 
-    def get_navig_block(self):
-        raise NotImplemented
+    def get_node(self) -> NodeInterface:
+        return self.item
+
+    def get_graph(self) -> GraphInterface:
+        return self.item.get_graph()
+
+    def get_typed_edge_links_iter(self, edge_type: Optional[te.EdgeType] = None) -> Generator:
+        node = self.get_node()
+        name = node.get_name()
+        graph = self.get_graph()
+        edges = graph.get_edges_dict()
+        for name_tuple in graph.get_edge_name_tuples_for_node(name, edge_type=edge_type):
+            a_name, b_name, edge_type_str = name_tuple
+            is_from_b = b_name == name and a_name != name
+            link_type = LINK_TYPES_BY_EDGE_TYPE_VALUE[edge_type_str][1 if is_from_b else 0]
+            link = node.get_link(a_name if is_from_b else b_name, link_type)
+            if not link:
+                link = cs.Link(edge=edges[name_tuple], is_from_b=is_from_b)
+            yield link_type, link
+
+    def get_edge_links_iter(self, edge_type: Optional[te.EdgeType] = None) -> Generator:
+        for _, link in self.get_typed_edge_links_iter(edge_type):
+            yield link
 
-    def get_title_block(self):
-        raise NotImplemented
+    def get_dependencies(self) -> list:
+        name = self.get_node().get_name()
+        dependencies = set()
+        for a_name, b_name, _ in self.get_graph().get_edge_name_tuples_for_node(name):
+            dependencies.add(b_name if a_name == name else a_name)
+        return sorted(dependencies)
+
+    def get_fingerprint(self, fmt: str = 'md') -> str:
+        node = self.get_node()
+        graph = self.get_graph()
+        parts = [str(RENDER_VERSION), fmt, node.get_fingerprint()]
+        for name_tuple in sorted(graph.get_edge_name_tuples_for_node(node.get_name())):
+            parts.extend(name_tuple)
+        for name in self.get_dependencies():  # titles of other nodes shown in navig and links blocks
+            other = graph.get_node_by_name(name)
+            titles = other.get_titles() if other else None
+            parts.append(name)
+            parts.append(titles[0] if titles else name)
+        data = FINGERPRINT_SEPARATOR.join(parts).encode('utf-8')
+        return hashlib.blake2b(data, digest_size=FINGERPRINT_SIZE).hexdigest()
+
+    def get_navig_block(self) -> Optional[BlockInterface]:
+        edge_type = NAVIG_LINK_TYPE.get_edge_type()
+        links = [i for t, i in self.get_typed_edge_links_iter(edge_type) if t == NAVIG_LINK_TYPE]
+        if links:
+            return cs.Block(block_type=te.BlockType.Links, items=links, anchor=NAVIG_LINK_TYPE.value)
+
+    def get_title_block(self) -> BlockInterface:
+        node = self.get_node()
+        titles = list(node.get_titles()) or [node.get_name()]
+        return cs.Block(block_type=te.BlockType.Title, items=titles)
 
     def get_content_blocks(self):
         return self.item.get_content_blocks_list()
 
-    def get_links_block(self):
-        raise NotImplemented
+    def get_links_blocks(self) -> Iterable:
+        links_by_type = dict()
+        for link_type, link in self.get_typed_edge_links_iter():
+            if link_type != NAVIG_LINK_TYPE:
+                links_by_type.setdefault(link_type, list()).append(link)
+        for link_type in te.LinkType:
+            links = links_by_type.get(link_type)
+            if links:
+                title = link_type.value.capitalize()
+                yield cs.Block(title=title, block_type=te.BlockType.Links, items=links, anchor=link_type.value)
 
     def get_blocks(self):
-        yield self.get_navig_block()
+        navig_block = self.get_navig_block()
+        if navig_block:
+            yield navig_block
         yield self.get_title_block()
-        yield self.get_content_blocks()
-        yield self.get_links_block()
+        yield from self.get_content_blocks()
+        yield from self.get_links_blocks()
 
     def get_content_count(self):
         cnt = 0
@@ -52,7 +135,26 @@ class Page(PageInterface):
             assert isinstance(block, cs.Block)
             yield from block.get_markdown()
 
+    def write_markdown(self, sink: TextIO) -> int:
+        return write_lines(sink, self.get_markdown())
+
     def get_html(self):
-        for block in self.get_blocks():
+        node = self.get_node()
+        yield HTML_PAGE_HEADER_TEMPLATE(get_escaped_html(node.get_main_title()))
+        navig_block = self.get_navig_block()
+        if navig_block:
+            yield '<nav>'
+            yield from navig_block.get_html()
+            yield '</nav>'
+        yield '<main>'
+        yield from self.get_title_block().get_html()
+        for block in self.get_content_blocks():
             assert isinstance(block, cs.Block)
             yield from block.get_html()
+        for block in self.get_links_blocks():
+            yield from block.get_html()
+        yield '</main>'
+        yield HTML_PAGE_FOOTER
+
+    def write_html(self, sink: TextIO) -> int:
+        return write_lines(sink, self.get_html())
@@ -10,6 +10,8 @@ Title = str
 
 
 class BlockInterface(ABC):
+    __slots__ = ()
+
     @staticmethod
     @abstractmethod
     def from_dict(obj: dict) -> Native:
@@ -55,6 +57,14 @@ class BlockInterface(ABC):
     def merge_block(self, block: Native) -> Native:
         pass
 
+    @abstractmethod
+    def copy(self) -> Native:
+        pass
+
+    @abstractmethod
+    def reset_item_set(self) -> Native:
+        pass
+
     @abstractmethod
     def get_content_count(self):
         pass
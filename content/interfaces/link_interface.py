@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 
 
 class LinkInterface(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def get_edge(self):
         pass
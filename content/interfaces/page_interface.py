@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 
 
 class PageInterface(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def get_content_blocks(self):
         pass
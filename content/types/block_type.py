@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Iterable
 
-from utils import get_canonic_synonym, is_in_synonyms
+from utils import get_compiled_synonyms
 
 BLOCK_TYPE_SYNONYMS = (
     ('title', 'head', 'header',),
@@ -20,6 +20,8 @@ class BlockType(Enum):
     Image = 'image'
     Links = 'links'
 
+    __hash__ = object.__hash__
+
     @staticmethod
     def get_type_synonyms() -> Iterable[tuple]:
         return BLOCK_TYPE_SYNONYMS
@@ -27,8 +29,10 @@ class BlockType(Enum):
     @classmethod
     def get_type(cls, block_type, skip_missing: bool = False):
         if isinstance(block_type, str):
-            block_type = get_canonic_synonym(block_type, synonyms_list=cls.get_type_synonyms(), class_name='Block')
-            return BlockType(block_type)
+            found_type = BLOCK_TYPES_BY_SYNONYM.get(block_type)
+            if found_type is None:
+                raise ValueError('key {} is not allowed for Block class'.format(block_type))
+            return found_type
         elif isinstance(block_type, BlockType):
             return block_type
         elif skip_missing:
@@ -39,6 +43,9 @@ class BlockType(Enum):
     @classmethod
     def has_type(cls, block_type) -> bool:
         if isinstance(block_type, str):
-            return is_in_synonyms(block_type, synonyms_list=cls.get_type_synonyms())
+            return block_type in BLOCK_TYPES_BY_SYNONYM
         elif isinstance(block_type, BlockType):
             return True
+
+
+BLOCK_TYPES_BY_SYNONYM = get_compiled_synonyms(BLOCK_TYPE_SYNONYMS, get_value=BlockType)
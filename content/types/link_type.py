@@ -1,6 +1,6 @@
 from enum import Enum
 
-from utils import get_canonic_synonym, is_in_synonyms
+from utils import get_compiled_synonyms
 from knowledge.types.edge_type import EdgeType
 
 LINK_TYPE_SYNONYMS = (
@@ -33,19 +33,25 @@ class LinkType(Enum):
     Reference = 'reference'
     Mention = 'mention'
 
+    __hash__ = object.__hash__  # Enum.__hash__ is implemented in Python, it slows down lookups in dicts by type
+
     def get_edge_type(self):
-        for edge_type in EdgeType:
-            if self in edge_type.get_link_types():
-                return edge_type
+        return EDGE_TYPES_BY_LINK_TYPE[self]
 
     def get_direction(self):
-        return self.get_edge_type().get_link_types()[1] == self
+        return DIRECTIONS_BY_LINK_TYPE[self]
+
+    @staticmethod
+    def get_link_types_by_edge_type(edge_type: EdgeType) -> tuple:
+        return LINK_TYPES_BY_EDGE_TYPE[edge_type]
 
     @staticmethod
     def get_type(link_type, skip_missing: bool = False):
         if isinstance(link_type, str):
-            link_type = get_canonic_synonym(link_type, synonyms_list=LINK_TYPE_SYNONYMS, class_name='Link')
-            return LinkType(link_type)
+            found_type = LINK_TYPES_BY_SYNONYM.get(link_type)
+            if found_type is None:
+                raise ValueError('key {} is not allowed for Link class'.format(link_type))
+            return found_type
         elif isinstance(link_type, LinkType):
             return link_type
         elif skip_missing:
@@ -56,10 +62,23 @@ class LinkType(Enum):
     @staticmethod
     def has_type(link_type) -> bool:
         if isinstance(link_type, str):
-            return is_in_synonyms(link_type, synonyms_list=LINK_TYPE_SYNONYMS)
+            return link_type in LINK_TYPES_BY_SYNONYM
         elif isinstance(link_type, LinkType):
             return True
 
     @staticmethod
     def get_default():
         return LinkType.Reference
+
+
+LINK_TYPES_BY_SYNONYM = get_compiled_synonyms(LINK_TYPE_SYNONYMS, get_value=LinkType)
+LINK_TYPES_BY_EDGE_TYPE = {
+    EdgeType.ParentChild: (LinkType.Parent, LinkType.Child),
+    EdgeType.PrereqMore: (LinkType.Prereq, LinkType.More),
+    EdgeType.UsesUsage: (LinkType.Uses, LinkType.Usage),
+    EdgeType.SourceReceptor: (LinkType.Source, LinkType.Receptor),
+    EdgeType.AlsoRelation: (LinkType.Also, LinkType.Relation),
+    EdgeType.ReferenceMention: (LinkType.Reference, LinkType.Mention),
+}
+EDGE_TYPES_BY_LINK_TYPE = {l: e for e, pair in LINK_TYPES_BY_EDGE_TYPE.items() for l in pair}
+DIRECTIONS_BY_LINK_TYPE = {l: pair.index(l) == 1 for pair in LINK_TYPES_BY_EDGE_TYPE.values() for l in pair}
@@ -0,0 +1,82 @@
+from typing import Optional, Iterable, Union
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import os
+
+try:  # Assume we're a submodule in a package.
+    from utils import get_detected_doctype_by_filename
+    from interfaces import GraphInterface
+    import classes as cs
+    import hierdoc as ct
+    import yamldoc as yd
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from .utils import get_detected_doctype_by_filename
+    from .interfaces import GraphInterface
+    from . import classes as cs
+    from . import hierdoc as ct
+    from . import yamldoc as yd
+
+DOCTYPES = 'yaml', 'txt'
+CHUNKS_PER_WORKER = 4  # smaller chunks even out workers on files of different size
+MIN_FILES_FOR_POOL = 16  # fewer files are parsed faster than worker processes start
+
+
+def get_corpus_paths(paths: Union[str, Iterable]) -> list:
+    if isinstance(paths, str):
+        if os.path.isdir(paths):
+            patterns = [os.path.join(paths, '**', '*.{}'.format(doctype)) for doctype in DOCTYPES]
+        else:
+            patterns = [paths]
+        paths = [path for pattern in patterns for path in glob.glob(pattern, recursive=True)]
+    return sorted({os.path.normpath(path) for path in paths})
+
+
+def read_corpus_file(path: str, use_cache: bool = False, verbose: bool = False) -> tuple:
+    doctype = get_detected_doctype_by_filename(path)
+    if doctype == 'yaml':
+        records = yd.get_parsed_yaml(path, use_cache=use_cache) or list()
+        if isinstance(records, dict):
+            records = [records]
+        for obj in records:
+            assert isinstance(obj, dict), 'expected dict in {}, got {}'.format(path, obj)
+    elif doctype == 'txt':
+        tree = ct.Tree(path, subtrees=list()).from_file(path, doctype=doctype, verbose=verbose)
+        records = [subtree.get_record() for subtree in tree.subtrees]  # root tree is file itself, not a node
+    else:
+        raise ValueError('expected doctype in {}, got {}'.format(DOCTYPES, doctype))
+    return doctype, records
+
+
+def read_corpus_files(paths: list, workers: int, use_cache: bool = False, verbose: bool = False) -> Iterable:
+    if workers <= 1 or len(paths) < MIN_FILES_FOR_POOL:
+        for path in paths:
+            yield read_corpus_file(path, use_cache, verbose)
+    else:
+        chunk_size = -(-len(paths) // (workers * CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            options = [use_cache] * len(paths), [verbose] * len(paths)
+            yield from pool.map(read_corpus_file, paths, *options, chunksize=chunk_size)
+
+
+def merge_records(graph: GraphInterface, records: list) -> int:
+    for obj in records:
+        cs.Node.build_node_from_dict(obj, graph=graph)
+    return len(records)
+
+
+def load_corpus(
+        paths: Union[str, Iterable],
+        workers: Optional[int] = None,
+        graph: Optional[GraphInterface] = None,
+        use_cache: bool = False,
+        verbose: bool = False,
+) -> GraphInterface:
+    if graph is None:
+        graph = cs.get_graph()
+    paths = get_corpus_paths(paths)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with cs.graph_context(graph), graph.batch():
+        for _, records in read_corpus_files(paths, workers, use_cache, verbose):  # results come in order of paths
+            merge_records(graph, records)
+    return graph
@@ -1,9 +1,10 @@
-from typing import Optional, Iterable
-import yaml
+from typing import Optional, Iterable, NamedTuple
 
 try:  # Assume we're a submodule in a package.
+    from utils import get_safe_loaded_yaml_iter, transliterate
     import classes as cs
 except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from .utils import get_safe_loaded_yaml_iter, transliterate
     from . import classes as cs
 
 
@@ -15,6 +16,8 @@ INDENT_STEP = 4
 MARKERS = ('*', '-', '+', '>', '&', 'i', '=')
 SKIP_MARKERS = ('0', 'x')
 NAME_DIVIDERS = (':', ' - ')
+PARENT_TAGS = ('parent', 'category', 'cat')
+CHILD_TAGS = ('child', 'children', 'struct', 'structure')
 MAX_WORDS_IN_NAME = 5
 
 
@@ -33,14 +36,100 @@ def str_has_indent(text):
     return False
 
 
-def transliterate(text):
-    symbols = (u"абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ",
-               u"abvgdeejzijklmnoprstufhzcss_y_euaABVGDEEJZIJKLMNOPRSTUFHZCSS_Y_EUA")
-    tr = {ord(a): ord(b) for a, b in zip(*symbols)}
-    return text.translate(tr)
+def get_level_and_text(text, level=0):
+    indent_count = (len(text) - len(text.lstrip(SPACE))) // INDENT_STEP
+    indent_count = min(indent_count, max(len(text) - 1, 0) // INDENT_STEP)
+    return level + indent_count, text[indent_count * INDENT_STEP:]
+
+
+class ParagraphFields(NamedTuple):
+    mark: Optional[str]
+    tag: Optional[str]
+    text: str
+    raw_name: Optional[str]
+    name: str
+    content: str
+
+
+def get_mark_from_text(text, standard_only=True):
+    if len(text) > 2:
+        if text[1] == SPACE:
+            marker = text[0]
+            if marker in MARKERS or marker in SKIP_MARKERS or not standard_only:
+                return marker
+
+
+def get_tag_from_text(text_without_marks):
+    text = text_without_marks + ' '
+    if text.startswith('['):
+        closed_scope_position = text.find('] ')
+        if closed_scope_position > 2:
+            tag = text[1: closed_scope_position]
+            tag = tag.lower()
+            tag.replace(SPACE, '_')
+            return tag
+
+
+def get_raw_name_from_text(text):
+    if (text or SPACE)[0] == '(':
+        closed_scope_position = text.find(')')
+        if closed_scope_position > 2:
+            return text[1: closed_scope_position]
+    for divider in NAME_DIVIDERS:
+        if divider in text:
+            text = text.split(divider)[0]
+        if len(text) < 20:
+            return text
+
+
+def get_name_from_text(text):
+    if (text or SPACE)[0] == '(':
+        closed_scope_position = text.find(') ')
+        if closed_scope_position > 2:
+            text = text[1: closed_scope_position]
+    for divider in NAME_DIVIDERS:
+        if divider in text:
+            text = text.split(divider)[0]
+    splitted_text = text.split(SPACE)
+    if len(splitted_text) > MAX_WORDS_IN_NAME:
+        text = SPACE.join(splitted_text[:MAX_WORDS_IN_NAME])
+    text = text.lower()
+    text.replace(SPACE, '_')
+    text = transliterate(text)
+    return text
+
+
+def get_paragraph_fields(text) -> ParagraphFields:
+    mark = get_mark_from_text(text)
+    text_without_marks = text[2:] if mark else text
+    tag = get_tag_from_text(text_without_marks)
+    if tag:
+        text_without_marks = text_without_marks[len(tag) + 3:]
+    raw_name = get_raw_name_from_text(text_without_marks)
+    if raw_name:
+        content = text_without_marks[len(raw_name) + 3:]
+    else:
+        content = text_without_marks
+    return ParagraphFields(
+        mark=mark,
+        tag=tag,
+        text=text_without_marks,
+        raw_name=raw_name,
+        name=get_name_from_text(text_without_marks),
+        content=content,
+    )
+
+
+def get_markdown_line(text, level, mark, max_header_level):
+    if level + 1 <= max_header_level:
+        return '#' * (level + 1) + ' ' + (text[2:] if mark else text)
+    else:
+        return SPACE * (level - max_header_level) * INDENT_STEP + text
 
 
 class Paragraph(object):
+    __slots__ = ('text', 'level', '_fields', '_parsed_text')
+
     def __init__(
             self,
             text,
@@ -49,6 +138,8 @@ class Paragraph(object):
     ):
         self.text = text
         self.level = level
+        self._fields = None
+        self._parsed_text = None
         if adjust_level:
             self.adjust_level()
 
@@ -57,22 +148,28 @@ class Paragraph(object):
 
     def set_line(self, text):
         self.text = str(text)
+        self._fields = None
         self.adjust_level()
 
     def has_indent(self):
         return str_has_indent(self.text)
 
     def adjust_level(self):
-        while str_has_indent(self.text):
-            self.level += 1
-            self.text = self.text[INDENT_STEP:]
+        self.level, self.text = get_level_and_text(self.text, self.level)
+
+    def get_fields(self) -> ParagraphFields:
+        fields = self._fields
+        if fields is None or self._parsed_text is not self.text:
+            fields = get_paragraph_fields(self.text)
+            self._fields = fields
+            self._parsed_text = self.text
+        return fields
 
     def get_mark(self, standard_only=True):
-        if len(self.text) > 2:
-            if self.text[1] == SPACE:
-                marker = self.text[0]
-                if marker in MARKERS or marker in SKIP_MARKERS or not standard_only:
-                    return marker
+        if standard_only:
+            return self.get_fields().mark
+        else:
+            return get_mark_from_text(self.text, standard_only=False)
 
     def get_text_without_marks(self):
         if self.get_mark():
@@ -81,93 +178,55 @@ class Paragraph(object):
             return self.text
 
     def get_markdown(self, rules=DEFAULT_RULES):
-        max_header_level = rules.get('max_header_level')
-        if self.level + 1 <= max_header_level:
-            markdown_line = '#' * (self.level + 1) + ' ' + self.get_text_without_marks()
-        else:
-            markdown_line = SPACE * (self.level - max_header_level) * INDENT_STEP + self.text
-        return [markdown_line]
+        return [get_markdown_line(self.text, self.level, self.get_mark(), rules.get('max_header_level'))]
 
     def get_tag(self):
-        text = self.get_text_without_marks() + ' '
-        if text.startswith('['):
-            closed_scope_position = text.find('] ')
-            if closed_scope_position > 2:
-                tag = text[1: closed_scope_position]
-                tag = tag.lower()
-                tag.replace(SPACE, '_')
-                return tag
+        return self.get_fields().tag
 
     def get_text_without_marks_and_tags(self):
-        tag = self.get_tag()
-        if tag:
-            return self.get_text_without_marks()[len(tag) + 3:]
-        else:
-            return self.get_text_without_marks()
+        return self.get_fields().text
 
     def has_name(self):
-        text = self.get_text_without_marks_and_tags()
-        if (text or SPACE)[0] == '(':
-            closed_scope_position = text.find(')')
-            if closed_scope_position > 2:
-                return text[1: closed_scope_position]
-        for divider in NAME_DIVIDERS:
-            if divider in text:
-                text = text.split(divider)[0]
-            if len(text) < 20:
-                return text
+        return self.get_fields().raw_name
 
     def get_name(self):
-        text = self.get_text_without_marks_and_tags()
-        if (text or SPACE)[0] == '(':
-            closed_scope_position = text.find(') ')
-            if closed_scope_position > 2:
-                text = text[1: closed_scope_position]
-        for divider in NAME_DIVIDERS:
-            if divider in text:
-                text = text.split(divider)[0]
-        splitted_text = text.split(SPACE)
-        if len(splitted_text) > MAX_WORDS_IN_NAME:
-            text = SPACE.join(splitted_text[:MAX_WORDS_IN_NAME])
-        text = text.lower()
-        text.replace(SPACE, '_')
-        text = transliterate(text)
-        return text
+        return self.get_fields().name
 
     def get_content(self):
-        text = self.get_text_without_marks_and_tags()
-        name = self.has_name()
-        if name:
-            return text[len(name) + 3:]
-        else:
-            return text
+        return self.get_fields().content
 
 
 Native = Paragraph
 
 
 class Tree(Paragraph):
+    __slots__ = ('name', 'subtrees', '_title_paragraph', '_title_text')
+
     def __init__(
             self,
             text,
             level=0,
             name=None,
-            subtrees=tuple(),
+            subtrees=None,
     ):
         Paragraph.__init__(self, text, level)
         self.name = name
-        if subtrees:
+        self._title_paragraph = None
+        self._title_text = None
+        if subtrees is not None:
             self.subtrees = list(subtrees)
         else:
             self.set_hiertext(text, including_title=True)
 
     def get_depth(self):
-        max_depth = -1
-        for subtree in self.subtrees:
-            cur_depth = subtree.get_depth()
-            if cur_depth > max_depth:
-                max_depth = cur_depth
-        return max_depth + 1
+        max_depth = 0
+        stack = [(self, 0)]
+        while stack:
+            tree, depth = stack.pop()
+            if depth > max_depth:
+                max_depth = depth
+            stack.extend((subtree, depth + 1) for subtree in tree.subtrees)
+        return max_depth
 
     def get_last_subtree(self):
         if self.subtrees:
@@ -188,51 +247,69 @@ class Tree(Paragraph):
     def get_mark(self, standard_only=True):
         return self.get_title_paragraph().get_mark(standard_only)
 
-    def remove_commented_subtrees(self, markers=SKIP_MARKERS):
-        for subtree in self.subtrees:
-            if subtree.get_mark() in markers:
-                self.subtrees.remove(subtree)
-                print('removed:', subtree.get_title_paragraph().text)
-            else:
-                subtree.remove_commented_subtrees(markers)
+    def remove_commented_subtrees(self, markers=SKIP_MARKERS, verbose=True):
+        stack = [self]
+        while stack:
+            tree = stack.pop()
+            kept_subtrees = list()
+            for subtree in tree.subtrees:
+                if subtree.get_mark() in markers:
+                    if verbose:
+                        print('removed:', subtree.get_title_paragraph().text)
+                else:
+                    kept_subtrees.append(subtree)
+            tree.subtrees = kept_subtrees
+            stack.extend(kept_subtrees)
+
+    def get_open_subtrees(self):
+        open_subtrees = [self]
+        last_subtree = self.get_last_subtree()
+        while last_subtree:
+            open_subtrees.append(last_subtree)
+            last_subtree = last_subtree.get_last_subtree()
+        return open_subtrees
 
     def add_paragraph(self, paragraph):
-        last_subtree_level = self.get_last_subtree_level()
-        if (last_subtree_level is not None) and (paragraph.level > last_subtree_level):
-            last_subtree = self.get_last_subtree()
-            last_subtree.add_paragraph(paragraph)
-        else:
-            new_subtree = Tree(paragraph.text, paragraph.level)
-            self.subtrees.append(new_subtree)
+        tree = self
+        last_subtree = tree.get_last_subtree()
+        while last_subtree and paragraph.level > last_subtree.level:
+            tree = last_subtree
+            last_subtree = tree.get_last_subtree()
+        tree.subtrees.append(Tree(paragraph.text, paragraph.level, subtrees=list()))
 
     def add_line(self, text, level=0):
         paragraph = Paragraph(text, level)
         self.add_paragraph(paragraph)
 
     def add_dict_obj(self, obj: dict) -> Native:
-        pass
+        cs.Node.build_node_from_dict(obj)
+        return self
 
     def add_yaml_text(self, lines: Iterable) -> Native:
-        yaml_data = yaml.safe_load(lines)
-        for obj in yaml_data:
+        for obj in get_safe_loaded_yaml_iter(lines):
             assert isinstance(obj, dict)
             self.add_dict_obj(obj)
         return self
 
-    def add_hiertext(self, hiertext, replace_tab=True, skip_commented=True):
+    def add_hiertext(self, hiertext, replace_tab=True, skip_commented=True, verbose=True):
+        open_subtrees = self.get_open_subtrees()
         for line in split_lines(hiertext):
             if replace_tab and line.startswith('\t'):
                 line = line.replace('\t', SPACE * INDENT_STEP)
-            self.add_line(line)
+            level, text = get_level_and_text(line)
+            while len(open_subtrees) > 1 and open_subtrees[-1].level >= level:
+                open_subtrees.pop()
+            new_subtree = Tree(text, level, subtrees=list())
+            open_subtrees[-1].subtrees.append(new_subtree)
+            open_subtrees.append(new_subtree)
         if skip_commented:
-            self.remove_commented_subtrees()
+            self.remove_commented_subtrees(verbose=verbose)
 
     def set_hiertext(self, hiertext, including_title=False):
-        lines = list(split_lines(hiertext))
+        lines = split_lines(hiertext)
         if including_title:
-            title = lines[0]
+            title = next(lines)
             self.text = title
-            lines = lines[1:]
         self.subtrees = list()
         self.add_hiertext(lines)
 
@@ -240,34 +317,47 @@ class Tree(Paragraph):
         return self.text
 
     def get_title_paragraph(self) -> Paragraph:
-        return Paragraph(self.text, self.level)
+        paragraph = self._title_paragraph
+        if paragraph is None or self._title_text is not self.text:
+            paragraph = Paragraph(self.text, self.level)
+            self._title_paragraph = paragraph
+            self._title_text = self.text
+        return paragraph
+
+    def get_subtrees_iter(self):
+        stack = [self]
+        while stack:
+            tree = stack.pop()
+            yield tree
+            stack.extend(reversed(tree.subtrees))
 
     def get_hiertext(self):
-        yield self.get_title_paragraph().get_line()
-        for subtree in self.subtrees:
-            for line in subtree.get_hiertext():
-                yield line
+        for tree in self.get_subtrees_iter():
+            yield tree.get_title_paragraph().get_line()
 
     def get_subtrees_count(self):
         return len(self.subtrees)
 
     def get_lines_count(self):
-        lines_count = 1
-        for subtree in self.subtrees:
-            lines_count += subtree.get_lines_count()
+        lines_count = 0
+        for _ in self.get_subtrees_iter():
+            lines_count += 1
         return lines_count
 
     def get_paragraphs(self):
-        yield self.get_title_paragraph()
-        for subtree in self.subtrees:
-            for paragraph in subtree.get_paragraphs():
-                yield paragraph
+        for tree in self.get_subtrees_iter():
+            yield tree.get_title_paragraph()
 
     def get_markdown(self, rules=DEFAULT_RULES):
-        for paragraph in self.get_paragraphs():
-            markdown_lines = paragraph.get_markdown(rules)
-            for line in markdown_lines:
-                yield line
+        max_header_level = rules.get('max_header_level')
+        for tree in self.get_subtrees_iter():  # no title Paragraph or fields are cached while rendering
+            yield get_markdown_line(tree.text, tree.level, get_mark_from_text(tree.text), max_header_level)
+
+    def write_markdown(self, sink, rules=DEFAULT_RULES):
+        write = sink.write
+        for line in self.get_markdown(rules):
+            write(line)
+            write('\n')
 
     @staticmethod
     def get_detected_doctype_by_filename(filename: str, default: Optional[str] = None) -> str:
@@ -280,46 +370,69 @@ class Tree(Paragraph):
         else:
             raise ValueError
 
-    def from_file(self, filename: str, doctype: str = None) -> Native:
+    def from_file(self, filename: str, doctype: str = None, verbose: bool = True) -> Native:
         if doctype is None:
-            doctype = self.get_detected_doctype_by_filename()
-        file_holder = open(filename, 'r', encoding='utf-8')
-        if doctype == 'txt':
-            self.add_hiertext(file_holder)
-        elif doctype == 'yaml':
-            self.add_yaml(file_holder)
-        else:
-            raise ValueError
-        file_holder.close()
+            doctype = self.get_detected_doctype_by_filename(filename)
+        with open(filename, 'r', encoding='utf-8') as file_holder:
+            if doctype == 'txt':
+                self.add_hiertext(file_holder, verbose=verbose)
+            elif doctype == 'yaml':
+                self.add_yaml_text(file_holder)
+            else:
+                raise ValueError
         return self
 
     def get_first_level_lines(self):
         for subtree in self.subtrees:
             yield subtree.get_title_paragraph()
 
+    def get_record(self) -> dict:
+        # same fields as get_item() builds, as plain dict for Node.build_node_from_dict()
+        cur = self.get_title_paragraph().get_fields()
+        titles = cur.content.split(' = ')
+        record = dict(id=cur.name or titles[0], title=titles)
+        for subtree in self.subtrees:
+            p = subtree.get_title_paragraph().get_fields()
+            if p.tag in PARENT_TAGS:
+                record.setdefault('parent', list()).append(dict(id=p.name or p.content, caption=p.content))
+            elif p.mark == '=' or p.tag in CHILD_TAGS:
+                elements = subtree.subtrees if p.content.endswith(':') or not p.content else [subtree]
+                for element in elements:
+                    child = element.get_record()
+                    child['caption'] = element.get_title_paragraph().get_fields().content
+                    record.setdefault('child', list()).append(child)
+            elif p.tag == 'usage':
+                elements = subtree.subtrees if p.content.endswith(':') else [subtree]
+                for element in elements:
+                    e = element.get_title_paragraph().get_fields()
+                    record.setdefault('usage', list()).append(dict(id=e.name or e.content, title=e.content))
+            else:
+                record.setdefault('info', list()).extend(subtree.get_hiertext())
+        return record
+
     def get_item(self, as_link_from=None, link_type=cs.LinkType.Reference):
-        cur = self.get_title_paragraph()
-        tag = cur.get_tag()
-        name = cur.get_name()
-        caption = cur.get_content()
+        cur = self.get_title_paragraph().get_fields()
+        tag = cur.tag
+        name = cur.name
+        caption = cur.content
         titles = caption.split(' = ')
         print('Parsing row: [{}] ({}) "{}"'.format(tag, name, caption))
         item = cs.Node(name, titles=titles)
         for subtree in self.subtrees:
             assert isinstance(subtree, Tree)
-            p = subtree.get_title_paragraph()
-            p_marker = p.get_mark()
-            p_tag = p.get_tag()
-            p_name = p.get_name()
-            p_text = p.get_content()
+            p = subtree.get_title_paragraph().get_fields()
+            p_marker = p.mark
+            p_tag = p.tag
+            p_name = p.name
+            p_text = p.content
             print('....p_marker={}, p_tag={}, p_name={}, p_name={}'.format(p_marker, p_tag, p_name, p_text))
-            if p_tag in ('parent', 'category', 'cat'):
+            if p_tag in PARENT_TAGS:
                 item.add_link_by_name(p_name, caption=p_text, link_type=cs.LinkType.Parent)
-            elif p_marker == '=' or p_tag in ('child', 'children', 'struct', 'structure'):
+            elif p_marker == '=' or p_tag in CHILD_TAGS:
                 if p_text.endswith(':') or not p_text:  # and subtree.get_depth() > 1:
                     item.add_content_block(cs.Block(p_text, cs.BlockType.Struct))
                     for element in subtree.subtrees:
-                        link = element.get_node(as_link_from=item, link_type=cs.LinkType.Child)
+                        link = element.get_item(as_link_from=item, link_type=cs.LinkType.Child)
                         item.add_content_item(link.copy(), block_type=cs.BlockType.Struct)
                 else:
                     link = subtree.get_item(as_link_from=item, link_type=cs.LinkType.Child)
@@ -327,8 +440,9 @@ class Tree(Paragraph):
             elif p_tag == 'usage':
                 if p_text.endswith(':'):  # and subtree.get_depth() > 1:
                     for element in subtree.subtrees:
-                        e_name = element.get_name()
-                        e_text = element.get_content()
+                        e = element.get_title_paragraph().get_fields()
+                        e_name = e.name
+                        e_text = e.content
                         item.add_link_by_name(e_name, e_text, link_type=cs.LinkType.Usage, create_node=True)
                 else:
                     item.add_link_by_name(p_name, p_text, link_type=cs.LinkType.Usage, create_node=True)
@@ -0,0 +1,182 @@
+from typing import Optional, Generator, Union
+import threading
+
+try:  # Assume we're a submodule in a package.
+    from interfaces import NodeInterface
+    from knowledge.implementations import traversal as tr
+    import type_enums as te
+    import classes as cs
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...interfaces import NodeInterface
+    from . import traversal as tr
+    from ... import type_enums as te
+    from ... import classes as cs
+
+Name = str
+Title = str
+Version = int
+
+MAX_VIEW_LAG = 10  # versions reader can skip while writer holds the lock, then it waits for fresh view
+
+
+class WriteLock:
+    # reentrant lock for writers, version is bumped when outermost writer has finished its changes
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._version = 0
+
+    def get_lock(self):
+        return self._lock
+
+    def get_version(self) -> Version:
+        return self._version
+
+    def is_writing(self) -> bool:
+        return self._depth > 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._depth -= 1
+        if not self._depth:
+            self._version += 1
+        self._lock.release()
+
+
+def get_frozen_adjacency(node_adjacency: dict) -> dict:
+    return {edge_type: tuple(name_tuples) for edge_type, name_tuples in node_adjacency.items()}
+
+
+class GraphView:
+    # immutable snapshot of graph, nodes changed after previous view are copied, others are shared with it
+    def __init__(
+            self,
+            version: Version,
+            nodes: dict,
+            titles: dict,
+            edges: dict,
+            adjacency: dict,
+    ):
+        self._version = version
+        self._nodes = nodes
+        self._titles = titles
+        self._edges = edges
+        self._adjacency = adjacency
+
+    @classmethod
+    def build(cls, graph, version: Version, base=None, touched_names: Optional[dict] = None):
+        live_adjacency = graph.get_adjacency_dict()
+        live_nodes = graph.get_nodes_dict()
+        if base is None or touched_names is None:
+            adjacency = {name: get_frozen_adjacency(a) for name, a in live_adjacency.items()}
+            nodes = {name: node.copy() for name, node in live_nodes.items()}
+        else:  # only nodes touched after base view are copied
+            adjacency = base.get_adjacency_dict().copy()
+            nodes = base.get_nodes_dict().copy()
+            for name in touched_names:
+                node_adjacency = live_adjacency.get(name)
+                if node_adjacency:
+                    adjacency[name] = get_frozen_adjacency(node_adjacency)
+                else:
+                    adjacency.pop(name, None)
+                node = live_nodes.get(name)
+                if node is not None:
+                    nodes[name] = node.copy()
+                else:
+                    nodes.pop(name, None)
+        copies = {id(node): nodes[name] for name, node in live_nodes.items()}
+        titles = {title: copies.get(id(node), node) for title, node in graph.get_titles_dict().items()}
+        edges = graph.get_edges_dict().copy()
+        return cls(version, nodes, titles, edges, adjacency)
+
+    def get_version(self) -> Version:
+        return self._version
+
+    def get_nodes_dict(self) -> dict:
+        return self._nodes
+
+    def get_nodes_iter(self) -> Generator:
+        return iter(self._nodes.values())
+
+    def get_node_count(self) -> int:
+        return len(self._nodes)
+
+    def has_name(self, name: Name) -> bool:
+        return name in self._nodes
+
+    def get_node_by_name(self, name: Name, default=None) -> Optional[NodeInterface]:
+        node = self._nodes.get(name)
+        if node is None:
+            node = self._titles.get(name, default)
+        return node
+
+    def get_node_by_title(self, title: Title, default=None) -> Optional[NodeInterface]:
+        return self._titles.get(title, default)
+
+    def get_node(self, obj: Union[NodeInterface, Name, Title]) -> Optional[NodeInterface]:
+        name = obj if isinstance(obj, str) else cs.get_name(obj)
+        return self.get_node_by_name(name)
+
+    def get_titles_dict(self) -> dict:
+        return self._titles
+
+    def get_edges_dict(self) -> dict:
+        return self._edges
+
+    def get_edge_count(self) -> int:
+        return len(self._edges)
+
+    def get_edge(self, a_name: Name, b_name: Name, edge_type: Union[te.EdgeType, str], default=None):
+        edge_type_str = edge_type if isinstance(edge_type, str) else edge_type.value
+        return self._edges.get((a_name, b_name, edge_type_str), default)
+
+    def get_adjacency_dict(self) -> dict:
+        return self._adjacency
+
+    def get_edge_name_tuples_for_node(
+            self,
+            node: Union[NodeInterface, Name],
+            edge_type: Union[te.EdgeType, str, None] = None,
+    ) -> list:
+        name = node if isinstance(node, Name) else cs.get_name(node)
+        node_adjacency = self._adjacency.get(name)
+        if not node_adjacency:
+            return list()
+        if edge_type:
+            return list(node_adjacency.get(te.EdgeType.get_type(edge_type), ()))
+        name_tuples = list()
+        for edges_by_type in node_adjacency.values():
+            name_tuples += edges_by_type
+        return name_tuples
+
+    def get_edges_for_node(
+            self,
+            node: Union[NodeInterface, Name],
+            edge_type: Union[te.EdgeType, str, None] = None,
+    ) -> Generator:
+        edges = self._edges
+        for name_tuple in self.get_edge_name_tuples_for_node(node, edge_type=edge_type):
+            yield edges[name_tuple]
+
+    def get_traversal_iter(
+            self,
+            start: Union[NodeInterface, Name],
+            link_types: tr.LinkTypes = None,
+            order: str = 'bfs',
+            max_depth: Optional[int] = None,
+            include_start: bool = False,
+    ) -> Generator:
+        return tr.get_traversal_iter(self, start, link_types, order=order, max_depth=max_depth, include_start=include_start)
+
+    def get_descendant_names(self, node: Union[NodeInterface, Name], max_depth: Optional[int] = None) -> list:
+        return tr.get_descendant_names(self, node, max_depth=max_depth)
+
+    def get_ancestor_names(self, node: Union[NodeInterface, Name], max_depth: Optional[int] = None) -> list:
+        return tr.get_ancestor_names(self, node, max_depth=max_depth)
+
+    def __repr__(self):
+        return 'GraphView({} nodes, {} edges, version {})'.format(self.get_node_count(), self.get_edge_count(), self._version)
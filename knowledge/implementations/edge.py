@@ -1,4 +1,5 @@
 from typing import Optional, NoReturn
+import sys
 
 try:  # Assume we're a submodule in a package.
     from interfaces import GraphInterface, NodeInterface, EdgeInterface, LinkInterface, BlockInterface
@@ -13,14 +14,18 @@ except ImportError:  # Apparently no higher-level package has been imported, fal
 
 
 class Edge(EdgeInterface):
+    __slots__ = ('_graph', '_node_a', '_node_b', '_edge_type')
+
     def __init__(
             self,
             node_a: NodeInterface,
             node_b: NodeInterface,
             edge_type: te.EdgeType,
             register: bool = True,
+            graph: Optional[GraphInterface] = None,
     ):
         assert isinstance(node_a, cs.Node), 'got {}'.format(node_a)
+        self._graph = node_a.get_graph() if graph is None else graph
         self._node_a = node_a
         assert isinstance(node_b, cs.Node), 'got {}'.format(node_b)
         self._node_b = node_b
@@ -38,15 +43,21 @@ class Edge(EdgeInterface):
     def get_nodes(self):
         return self.get_a(), self.get_b()
 
+    def set_nodes(self, node_a: NodeInterface, node_b: NodeInterface) -> EdgeInterface:
+        assert node_a.get_name() == self._node_a.get_name()
+        assert node_b.get_name() == self._node_b.get_name()
+        self._node_a = node_a
+        self._node_b = node_b
+        return self
+
     def get_node_pairs(self):
         return self.get_nodes(), reversed(self.get_nodes())
 
-    @staticmethod
-    def get_graph() -> GraphInterface:
-        return cs.get_graph()
+    def get_graph(self) -> GraphInterface:
+        return self._graph
 
     def copy(self):
-        return Edge(self._node_a, self._node_b, self._edge_type, register=False)
+        return Edge(self._node_a, self._node_b, self._edge_type, register=False, graph=self._graph)
 
     def register(self):
         self.get_graph().add_edge(self)
@@ -58,16 +69,21 @@ class Edge(EdgeInterface):
                 return other
 
     def get_links(self):
-        for item, other in self.get_node_pairs():
-            yield item.get_link(other, self._edge_type)
+        for (item, other), link_type in zip(self.get_node_pairs(), self.get_link_types()):
+            yield item.get_link(other, link_type)
 
     def get_link_pairs(self):
-        return list(self.get_links()), reversed(list(self.get_links()))
+        links = list(self.get_links())
+        return links, list(reversed(links))
 
     def get_other_link(self, item_or_link):
-        for link, other in self.get_link_pairs():
-            if link == cs.get_link(item_or_link):
-                return other
+        if isinstance(item_or_link, cs.Link):
+            name = item_or_link.get_source_name()
+        else:
+            name = cs.get_name(item_or_link)
+        for (item, _), (_, other_link) in zip(self.get_node_pairs(), self.get_link_pairs()):
+            if item.get_name() == name:
+                return other_link
 
     def get_link_types(self):
         return self._edge_type.get_link_types()
@@ -79,7 +95,7 @@ class Edge(EdgeInterface):
         return self._node_a.get_name(), self._node_b.get_name(), self.get_type().value
 
     def is_defined_in_item(self, item):
-        return cs.get_graph().get_node(item).has_outgoing_edge(self)
+        return self.get_graph().get_node(item).has_outgoing_edge(self)
 
     def is_defined_in_a(self):
         return self._node_a.has_outgoing_link_to_node(self._node_b)
@@ -87,5 +103,8 @@ class Edge(EdgeInterface):
     def is_defined_in_b(self):
         return self._node_b.has_outgoing_link_to_node(self._node_a)
 
+    def get_memory_size(self) -> int:
+        return sys.getsizeof(self)
+
     def drop(self) -> NoReturn:
         self.get_graph().drop_edge(self)
@@ -0,0 +1,176 @@
+from typing import Optional, Iterator
+from collections.abc import MutableMapping
+from array import array
+import sys
+
+try:  # Assume we're a submodule in a package.
+    from interfaces import GraphInterface, EdgeInterface
+    import type_enums as te
+    import classes as cs
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...interfaces import GraphInterface, EdgeInterface
+    from ... import type_enums as te
+    from ... import classes as cs
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+Name = str
+NameTuple = tuple  # (a_name, b_name, edge_type_str)
+NodeId = int
+Row = int
+
+EDGE_TYPES = tuple(te.EdgeType)
+EDGE_TYPE_CODES = {t.value: n for n, t in enumerate(EDGE_TYPES)}
+DROPPED = -1  # type code of tombstone rows
+TYPE_BITS = 4
+ID_BITS = 32
+MIN_ROWS_FOR_COMPACT = 1024
+
+
+class ColumnarEdgeStore(MutableMapping):
+    def __init__(self, graph: Optional[GraphInterface] = None):
+        self._graph = graph
+        self._node_ids = dict()
+        self._names = list()
+        self._src = array('I')
+        self._dst = array('I')
+        self._types = array('b')
+        self._index = dict()
+        self._dropped_count = 0
+
+    def get_graph(self) -> GraphInterface:
+        return self._graph
+
+    def set_graph(self, graph: GraphInterface):
+        self._graph = graph
+        return self
+
+    def get_node_id(self, name: Name, create_if_not_exists: bool = False) -> Optional[NodeId]:
+        node_id = self._node_ids.get(name)
+        if node_id is None and create_if_not_exists:
+            node_id = len(self._names)
+            assert node_id < 1 << ID_BITS, 'too many nodes for edge store'
+            self._node_ids[name] = node_id
+            self._names.append(name)
+        return node_id
+
+    def get_node_name(self, node_id: NodeId) -> Name:
+        return self._names[node_id]
+
+    @staticmethod
+    def get_packed_key(src: NodeId, dst: NodeId, type_code: int) -> int:
+        return (((src << ID_BITS) | dst) << TYPE_BITS) | type_code
+
+    def get_row(self, name_tuple: NameTuple) -> Optional[Row]:
+        a_name, b_name, edge_type_str = name_tuple
+        src = self._node_ids.get(a_name)
+        dst = self._node_ids.get(b_name)
+        type_code = EDGE_TYPE_CODES.get(edge_type_str)
+        if src is None or dst is None or type_code is None:
+            return None
+        return self._index.get(self.get_packed_key(src, dst, type_code))
+
+    def get_name_tuple(self, row: Row) -> NameTuple:
+        return self._names[self._src[row]], self._names[self._dst[row]], EDGE_TYPES[self._types[row]].value
+
+    def get_edge(self, row: Row) -> EdgeInterface:
+        graph = self.get_graph()
+        assert graph is not None, 'edge store is not bound to a graph'
+        nodes = list()
+        for node_id in self._src[row], self._dst[row]:
+            name = self._names[node_id]
+            node = graph.get_nodes_dict().get(name)
+            if node is None:
+                node = cs.Node(name=name, register=False, graph=graph)
+            nodes.append(node)
+        return cs.Edge(*nodes, EDGE_TYPES[self._types[row]], register=False, graph=graph)
+
+    def get_rows_iter(self) -> Iterator[Row]:
+        types = self._types
+        for row in range(len(types)):
+            if types[row] != DROPPED:
+                yield row
+
+    def get_columns(self) -> tuple:
+        return self._src, self._dst, self._types
+
+    def get_numpy_columns(self) -> tuple:
+        if np is None:
+            raise ImportError('numpy is required for get_numpy_columns()')
+        src, dst, types = self.get_columns()
+        return np.frombuffer(src, dtype=np.uint32), np.frombuffer(dst, dtype=np.uint32), np.frombuffer(types, dtype=np.int8)
+
+    def __getitem__(self, name_tuple: NameTuple) -> EdgeInterface:
+        row = self.get_row(name_tuple)
+        if row is None:
+            raise KeyError(name_tuple)
+        return self.get_edge(row)
+
+    def __setitem__(self, name_tuple: NameTuple, edge: EdgeInterface):
+        a_name, b_name, edge_type_str = name_tuple
+        assert edge_type_str in EDGE_TYPE_CODES, 'got {}'.format(edge_type_str)
+        src = self.get_node_id(a_name, create_if_not_exists=True)
+        dst = self.get_node_id(b_name, create_if_not_exists=True)
+        type_code = EDGE_TYPE_CODES[edge_type_str]
+        key = self.get_packed_key(src, dst, type_code)
+        if key not in self._index:
+            self._index[key] = len(self._types)
+            self._src.append(src)
+            self._dst.append(dst)
+            self._types.append(type_code)
+
+    def __delitem__(self, name_tuple: NameTuple):
+        row = self.get_row(name_tuple)
+        if row is None:
+            raise KeyError(name_tuple)
+        del self._index[self.get_packed_key(self._src[row], self._dst[row], self._types[row])]
+        self._types[row] = DROPPED
+        self._dropped_count += 1
+        if self._dropped_count >= MIN_ROWS_FOR_COMPACT and self._dropped_count * 2 > len(self._types):
+            self.compact()
+
+    def compact(self):
+        rows = list(self.get_rows_iter())
+        self._src = array('I', (self._src[r] for r in rows))
+        self._dst = array('I', (self._dst[r] for r in rows))
+        self._types = array('b', (self._types[r] for r in rows))
+        self._index = {self.get_packed_key(*columns): row for row, columns in enumerate(zip(*self.get_columns()))}
+        self._dropped_count = 0
+        return self
+
+    def __contains__(self, name_tuple) -> bool:
+        return isinstance(name_tuple, tuple) and len(name_tuple) == 3 and self.get_row(name_tuple) is not None
+
+    def __iter__(self) -> Iterator[NameTuple]:
+        for row in self.get_rows_iter():
+            yield self.get_name_tuple(row)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, name_tuple: NameTuple, default=None) -> Optional[EdgeInterface]:
+        row = self.get_row(name_tuple)
+        if row is None:
+            return default
+        return self.get_edge(row)
+
+    def clear(self):
+        self._node_ids.clear()
+        self._names.clear()
+        self._src = array('I')
+        self._dst = array('I')
+        self._types = array('b')
+        self._index.clear()
+        self._dropped_count = 0
+
+    def get_memory_size(self) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(self._node_ids) + sys.getsizeof(self._names)
+        size += sum(sys.getsizeof(c) for c in self.get_columns())
+        size += sys.getsizeof(self._index) + sum(sys.getsizeof(k) for k in self._index)
+        return size
+
+    def __repr__(self):
+        return 'ColumnarEdgeStore({} edges, {} nodes)'.format(len(self), len(self._names))
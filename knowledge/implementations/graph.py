@@ -1,38 +1,98 @@
 from typing import Optional, Generator, Iterable, Union, NoReturn
+from contextlib import contextmanager, nullcontext
 import gc
+import sys
 
 try:  # Assume we're a submodule in a package.
-    from utils import singleton
     from interfaces import GraphInterface, NodeInterface, EdgeInterface, LinkInterface, BlockInterface
     import type_enums as te
     import classes as cs
     import builders as bs
+    from knowledge.implementations import snapshot as sn
+    from knowledge.implementations import edge_store as es
+    from knowledge.implementations import site_export as ex
+    from knowledge.implementations import traversal as tr
+    from knowledge.implementations import prerequisites as pr
+    from knowledge.implementations import reachability as ri
+    from knowledge.implementations import search_index as si
+    from knowledge.implementations import title_index as ti
+    from knowledge.implementations import concurrency as cc
 except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
-    from ...utils import singleton
     from ...interfaces import GraphInterface, NodeInterface, EdgeInterface, LinkInterface, BlockInterface
     from ... import type_enums as te
     from ... import classes as cs
     from ... import builders as bs
+    from . import snapshot as sn
+    from . import edge_store as es
+    from . import site_export as ex
+    from . import traversal as tr
+    from . import prerequisites as pr
+    from . import reachability as ri
+    from . import search_index as si
+    from . import title_index as ti
+    from . import concurrency as cc
 
 Native = GraphInterface
 Name = str
 Title = str
 
 
-@singleton
 class Graph(GraphInterface):
     def __init__(
             self,
             nodes: Optional[dict] = None,
             edges: Optional[dict] = None,
+            share_edges: bool = False,
+            resolve_closest: bool = False,
+            thread_safe: bool = False,
     ):
         self._nodes = nodes or dict()
-        self._edges = edges or dict()
+        self._edges = edges if edges is not None else dict()
+        if isinstance(self._edges, es.ColumnarEdgeStore):
+            if share_edges:
+                raise ValueError('share_edges is not supported by ColumnarEdgeStore, edges are built on demand')
+            if thread_safe:
+                raise ValueError('thread_safe is not supported by ColumnarEdgeStore, edges are built on demand')
+            self._edges.set_graph(self)
+        self._share_edges = share_edges
+        self._resolve_closest = resolve_closest
+        self._titles = dict()
+        self._shadowed_titles = dict()  # title -> other nodes having it, owner is replaced by them when dropped
+        self._adjacency = dict()
+        self._edge_versions = dict()
+        self._prerequisite_plan = None
+        self._reachability_index = None
+        self._search_index = None
+        self._title_index = None
+        self._page_records = None
+        self._listeners = list()
+        self._write_lock = cc.WriteLock() if thread_safe else nullcontext()
+        self._view = None
+        self._touched_names = dict() if thread_safe else None  # nodes changed after last view
+        self._pending_nodes = None
+        self._pending_names = dict()
+        self._pending_titles = dict()
+        self._pending_edges = list()
+        for node in self._nodes.values():
+            self.add_node_titles(node)
+        for name_tuple in self._edges:
+            self.add_edge_to_adjacency(name_tuple)
 
     def clear(self) -> Native:
-        self._nodes.clear()
-        self._edges.clear()
-        gc.collect()
+        with self._write_lock:
+            was_empty = not self._nodes and not self._edges
+            self._nodes.clear()
+            self._edges.clear()
+            self._titles.clear()
+            self._shadowed_titles.clear()
+            self._adjacency.clear()
+            for edge_type in self._edge_versions:
+                self._edge_versions[edge_type] += 1
+            if self._touched_names is not None:
+                self._touched_names = None  # next view copies whole adjacency
+            self.notify('on_clear')
+        if not was_empty:
+            gc.collect()
         return self
 
     def get_nodes_dict(self) -> dict:
@@ -73,7 +133,7 @@ class Graph(GraphInterface):
                 self.add_node(obj)
                 return obj
             elif isinstance(obj, Name):
-                node = cs.Node(name=node)
+                node = cs.Node(name=obj, register=False, graph=self)
                 self.add_node(node)
                 return node
             else:
@@ -84,46 +144,147 @@ class Graph(GraphInterface):
         assert isinstance(name, str)
         if name in self.get_nodes_dict():
             return self.get_nodes_dict()[name]
+        if name in self._pending_names:
+            return self._pending_names[name]
         return self.get_node_by_title(name, default)
 
     def get_node_by_title(self, title: Title, default=None) -> Optional[NodeInterface]:
         assert isinstance(title, str)
-        for node in self.get_nodes_dict().values():
-            assert isinstance(node, NodeInterface), node
-            if title in node.get_titles():
-                return node
-        return default
+        node = self._titles.get(title)
+        if node is None:
+            node = self._pending_titles.get(title, default)
+        return node
+
+    def get_titles_dict(self) -> dict:
+        return self._titles
+
+    def add_node_title(self, node: NodeInterface, title: Title) -> Native:
+        name = node.get_name()
+        with self._write_lock:
+            if self.get_nodes_dict().get(name) is node:
+                self.add_title_to_index(title, node)
+                self.update_node(node)
+            elif self._pending_names.get(name) is node:
+                self._pending_titles.setdefault(title, node)
+        return self
+
+    def add_title_to_index(self, title: Title, node: NodeInterface) -> Native:
+        owner = self._titles.setdefault(title, node)
+        if owner is not node:
+            holders = self._shadowed_titles.setdefault(title, list())
+            if not any(i is node for i in holders):
+                holders.append(node)
+        return self
+
+    def add_node_titles(self, node: NodeInterface) -> Native:
+        for title in node.get_titles():
+            self.add_title_to_index(title, node)
+        return self
+
+    def drop_node_titles(self, node: NodeInterface) -> Native:
+        for title in node.get_titles():
+            holders = self._shadowed_titles.get(title)
+            if holders:
+                holders = [i for i in holders if i is not node]
+            if self._titles.get(title) is node:
+                if holders:
+                    self._titles[title] = holders.pop(0)
+                else:
+                    self._titles.pop(title)
+            if holders:
+                self._shadowed_titles[title] = holders
+            else:
+                self._shadowed_titles.pop(title, None)
+        return self
 
     def add_node(self, node: NodeInterface) -> Native:
         assert isinstance(node, NodeInterface), 'expected Node, got {}'.format(node)
-        name = node.get_name()
-        self.get_nodes_dict()[name] = node
+        with self._write_lock:
+            if self.is_batch_mode():
+                return self.add_pending_node(node)
+            name = node.get_name()
+            replaced_node = self.get_nodes_dict().get(name)
+            if replaced_node is not None and replaced_node is not node:
+                self.drop_node_titles(replaced_node)
+            self.get_nodes_dict()[name] = node
+            self.add_node_titles(node)
+            self.touch_node(name)
+            if self._listeners:
+                self.notify('on_add_node', node)
         return self
 
     def rename_item(self, old_name: Name, new_name: Name) -> NoReturn:
         assert isinstance(old_name, str)
         assert isinstance(new_name, str)
-        assert old_name in self._nodes
-        assert new_name not in self._nodes
-        item = self.get_node(old_name)
-        self._nodes[new_name] = item
-        del self._nodes[old_name]
+        with self._write_lock:  # names are checked by writer holding the lock
+            assert old_name in self._nodes
+            assert new_name not in self._nodes
+            item = self.get_node(old_name)
+            self._nodes[new_name] = item
+            del self._nodes[old_name]
+            self.touch_node(old_name).touch_node(new_name)
+            self.rename_node_in_edges(old_name, new_name)
+
+    def rename_node_in_edges(self, old_name: Name, new_name: Name) -> Native:
+        node_adjacency = self._adjacency.pop(old_name, None)
+        if node_adjacency:
+            self.rename_node_adjacency(old_name, new_name, node_adjacency)
+        self.notify('on_rename_node', old_name, new_name)  # node without edges is renamed in indexes too
+        return self
+
+    def rename_node_adjacency(self, old_name: Name, new_name: Name, node_adjacency: dict) -> Native:
+        self._adjacency[new_name] = node_adjacency
+        if self._touched_names is not None:
+            self._touched_names[old_name] = None
+            for name_tuples in node_adjacency.values():
+                for a_name, b_name, _ in name_tuples:
+                    self._touched_names[a_name] = self._touched_names[b_name] = None
+        neighbour_names = {new_name}
+        for edge_type, name_tuples in node_adjacency.items():
+            self.touch_edge_type(edge_type)
+            for name_tuple in list(name_tuples):
+                a_name, b_name, edge_type_str = name_tuple
+                new_name_tuple = (
+                    new_name if a_name == old_name else a_name,
+                    new_name if b_name == old_name else b_name,
+                    edge_type_str,
+                )
+                self._edges[new_name_tuple] = self._edges.pop(name_tuple)
+                for name in {new_name_tuple[0], new_name_tuple[1]}:
+                    edges_by_type = self._adjacency[name][edge_type]
+                    edges_by_type.pop(name_tuple, None)
+                    edges_by_type[new_name_tuple] = None
+                    neighbour_names.add(name)
+        for name in neighbour_names:  # outgoing links of nodes are indexed by target name
+            node = self._nodes.get(name)
+            if node is not None:
+                node.rename_link_target(old_name, new_name)
+        return self
 
     def add_edge(self, edge: EdgeInterface, if_not_exists: bool = False) -> Native:
         assert isinstance(edge, cs.Edge)
-        name_tuple = edge.get_name_tuple()
-        existing_edge = self.get_edge(*name_tuple)
-        if existing_edge:
-            edge = existing_edge
-        else:
-            self._edges[name_tuple] = edge
-        if edge.get_a().get_name() not in self._nodes:
-            assert not edge.get_a().is_registered()
-            self.add_node(edge.get_a())
-        if edge.get_b().get_name() not in self._nodes:
-            assert not edge.get_b().is_registered()
-            self.add_node(edge.get_b())
-        return self
+        with self._write_lock:
+            if self.is_batch_mode():
+                self._pending_edges.append(edge)
+                for node in edge.get_nodes():
+                    name = node.get_name()
+                    if name not in self._nodes and name not in self._pending_names:
+                        self.add_pending_node(node)
+                return self
+            name_tuple = edge.get_name_tuple()
+            existing_edge = self.get_edge(*name_tuple)
+            if existing_edge:
+                edge = existing_edge
+            else:
+                self._edges[name_tuple] = edge
+                self.add_edge_to_adjacency(name_tuple, edge.get_type())
+            if edge.get_a().get_name() not in self._nodes:
+                assert not edge.get_a().is_registered()
+                self.add_node(edge.get_a())
+            if edge.get_b().get_name() not in self._nodes:
+                assert not edge.get_b().is_registered()
+                self.add_node(edge.get_b())
+            return self
 
     def get_edge(self, a_name, b_name, edge_type, default=None):
         assert isinstance(a_name, str)
@@ -135,23 +296,124 @@ class Graph(GraphInterface):
     def get_edges_dict(self):
         return self._edges
 
-    def get_edges_for_node(self, node: Union[NodeInterface, Name]) -> Generator:
-        for name_tuple, edge in self.get_edges_dict().items():
-            if isinstance(node, cs.Node) and node in edge.get_nodes():
-                yield edge
-            if isinstance(node, Name) and node in name_tuple:
-                yield edge
+    def add_edge_to_adjacency(self, name_tuple: tuple, edge_type: Optional[te.EdgeType] = None) -> Native:
+        a_name, b_name, edge_type_str = name_tuple
+        edge_type = edge_type or te.EdgeType(edge_type_str)
+        self.touch_edge_type(edge_type)
+        for name in {a_name, b_name}:
+            node_adjacency = self._adjacency.setdefault(name, dict())
+            node_adjacency.setdefault(edge_type, dict())[name_tuple] = None
+        if self._touched_names is not None:
+            self._touched_names[a_name] = self._touched_names[b_name] = None
+        if self._listeners:
+            self.notify('on_add_edge', name_tuple)
+        return self
+
+    def drop_edge_from_adjacency(self, name_tuple: tuple) -> Native:
+        a_name, b_name, edge_type_str = name_tuple
+        edge_type = te.EdgeType(edge_type_str)
+        self.touch_edge_type(edge_type)
+        for name in {a_name, b_name}:
+            node_adjacency = self._adjacency.get(name, dict())
+            edges_by_type = node_adjacency.get(edge_type, dict())
+            edges_by_type.pop(name_tuple, None)
+            if not edges_by_type:
+                node_adjacency.pop(edge_type, None)
+            if not node_adjacency:
+                self._adjacency.pop(name, None)
+        if self._touched_names is not None:
+            self._touched_names[a_name] = self._touched_names[b_name] = None
+        if self._listeners:
+            self.notify('on_drop_edge', name_tuple)
+        return self
+
+    def get_adjacency_dict(self) -> dict:
+        return self._adjacency
+
+    def add_listener(self, listener) -> Native:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+        return self
+
+    def drop_listener(self, listener) -> Native:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+        return self
+
+    def notify(self, event: str, *args) -> Native:
+        for listener in self._listeners:
+            handler = getattr(listener, event, None)  # listener implements only events it needs
+            if handler is not None:
+                handler(*args)
+        return self
+
+    def get_edge_versions_dict(self) -> dict:
+        return self._edge_versions
+
+    def get_edge_version(self, edge_type: Union[te.EdgeType, str]) -> int:
+        return self._edge_versions.get(te.EdgeType.get_type(edge_type), 0)
+
+    def touch_edge_type(self, edge_type: te.EdgeType) -> Native:
+        self._edge_versions[edge_type] = self._edge_versions.get(edge_type, 0) + 1
+        return self
+
+    def update_node(self, node: NodeInterface) -> Native:
+        name = node.get_name()
+        if self._nodes.get(name) is node:  # node being built is reported when it is added
+            self.touch_node(name)
+            if self._listeners:
+                self.notify('on_update_node', node)
+        return self
+
+    def touch_node(self, name: Name) -> Native:
+        if self._touched_names is not None:  # next view copies this node instead of reusing previous copy
+            self._touched_names[name] = None
+        return self
+
+    def get_edge_name_tuples_for_node(
+            self,
+            node: Union[NodeInterface, Name],
+            edge_type: Union[te.EdgeType, str, None] = None,
+    ) -> list:
+        name = node if isinstance(node, Name) else cs.get_name(node)
+        node_adjacency = self._adjacency.get(name)
+        if not node_adjacency:
+            return list()
+        if edge_type:
+            edge_type = te.EdgeType.get_type(edge_type)
+            return list(node_adjacency.get(edge_type, dict()))
+        name_tuples = list()
+        for edges_by_type in node_adjacency.values():
+            name_tuples += edges_by_type
+        return name_tuples
+
+    def get_edges_for_node(
+            self,
+            node: Union[NodeInterface, Name],
+            edge_type: Union[te.EdgeType, str, None] = None,
+    ) -> Generator:
+        edges = self.get_edges_dict()
+        for name_tuple in self.get_edge_name_tuples_for_node(node, edge_type=edge_type):
+            yield edges[name_tuple]
 
     def get_edge_count(self) -> int:
         return len(self.get_edges_dict())
 
-    def get_outgoing_edges(self, node: Union[NodeInterface, Name]) -> Iterable:
-        for edge in self.get_edges_for_node(node):
+    def get_outgoing_edges(
+            self,
+            node: Union[NodeInterface, Name],
+            edge_type: Union[te.EdgeType, str, None] = None,
+    ) -> Iterable:
+        for edge in self.get_edges_for_node(node, edge_type=edge_type):
             if edge.is_defined_in_item(node):
                 yield edge
 
-    def get_incoming_edges(self, node: Union[NodeInterface, Name]) -> Iterable:
-        for edge in self.get_edges_for_node(node):
+    def get_incoming_edges(
+            self,
+            node: Union[NodeInterface, Name],
+            edge_type: Union[te.EdgeType, str, None] = None,
+    ) -> Iterable:
+        for edge in self.get_edges_for_node(node, edge_type=edge_type):
             if not edge.is_defined_in_item(node):
                 yield edge
 
@@ -162,10 +424,271 @@ class Graph(GraphInterface):
             edge_name_tuple = edge.get_name_tuple()
         else:
             raise TypeError('got {}'.format(edge))
-        assert edge_name_tuple in self.get_edges_dict(), 'edge {} not found'.format(edge_name_tuple)
-        self.get_edges_dict().pop(edge_name_tuple)
+        with self._write_lock:
+            assert edge_name_tuple in self.get_edges_dict(), 'edge {} not found'.format(edge_name_tuple)
+            self.get_edges_dict().pop(edge_name_tuple)
+            self.drop_edge_from_adjacency(edge_name_tuple)
+        return self
+
+    def get_traversal_iter(
+            self,
+            start: Union[NodeInterface, Name],
+            link_types: tr.LinkTypes = None,
+            order: str = 'bfs',
+            max_depth: Optional[int] = None,
+            include_start: bool = False,
+    ) -> Generator:
+        return tr.get_traversal_iter(self, start, link_types, order=order, max_depth=max_depth, include_start=include_start)
+
+    def get_descendant_names(self, node: Union[NodeInterface, Name], max_depth: Optional[int] = None) -> list:
+        return tr.get_descendant_names(self, node, max_depth=max_depth)
+
+    def get_ancestor_names(self, node: Union[NodeInterface, Name], max_depth: Optional[int] = None) -> list:
+        return tr.get_ancestor_names(self, node, max_depth=max_depth)
+
+    def get_prerequisite_plan(self) -> pr.PrerequisitePlan:
+        if self._prerequisite_plan is None:
+            self._prerequisite_plan = pr.PrerequisitePlan(self)
+        return self._prerequisite_plan
+
+    def get_learning_path(self, target: Union[NodeInterface, Name]) -> list:
+        return self.get_prerequisite_plan().get_learning_path(target)
+
+    def get_reachability_index(self) -> ri.ReachabilityIndex:
+        if self._reachability_index is None:
+            self._reachability_index = ri.ReachabilityIndex(self)
+        return self._reachability_index
+
+    def is_descendant(self, node: Union[NodeInterface, Name], ancestor: Union[NodeInterface, Name]) -> bool:
+        return self.get_reachability_index().is_descendant(node, ancestor)
+
+    def get_search_index(self) -> si.SearchIndex:
+        if self._search_index is None:
+            self._search_index = si.SearchIndex(self)
+        return self._search_index
+
+    def search(self, query: str, limit: Optional[int] = si.DEFAULT_LIMIT) -> list:
+        return self.get_search_index().search(query, limit=limit)
+
+    def get_title_index(self) -> ti.TitleIndex:
+        if self._title_index is None:
+            self._title_index = ti.TitleIndex(self)
+        return self._title_index
+
+    def find_nodes(
+            self,
+            prefix: Optional[str] = None,
+            approx: Optional[str] = None,
+            limit: Optional[int] = ti.DEFAULT_LIMIT,
+    ) -> list:
+        names = self.get_title_index().find_node_names(prefix=prefix, approx=approx, limit=limit)
+        return [self._nodes[name] for name in names]
+
+    def get_closest_node(self, text: str, max_distance: Optional[int] = None) -> Optional[NodeInterface]:
+        node = self.get_node(text)
+        if node is None:
+            name = self.get_title_index().get_closest_name(text, max_distance=max_distance)
+            if name is not None:
+                node = self._nodes[name]
+        return node
+
+    def is_resolving_closest(self) -> bool:
+        return self._resolve_closest
+
+    def set_resolving_closest(self, resolve_closest: bool = True) -> Native:
+        self._resolve_closest = resolve_closest
+        return self
+
+    def is_thread_safe(self) -> bool:
+        return isinstance(self._write_lock, cc.WriteLock)
+
+    def writing(self):
+        return self._write_lock
+
+    def get_view(self) -> cc.GraphView:
+        if not self.is_thread_safe():
+            raise ValueError('snapshot views are available for Graph(thread_safe=True) only')
+        view = self._view
+        version = self._write_lock.get_version()
+        if view is not None and view.get_version() == version:
+            return view  # readers do not take the lock while graph is not changed
+        # previous view is consistent too, so readers do not wait for busy writer until view is too old
+        is_blocking = view is None or version - view.get_version() > cc.MAX_VIEW_LAG
+        lock = self._write_lock.get_lock()
+        if not lock.acquire(blocking=is_blocking):
+            return view
+        try:
+            if self._write_lock.is_writing():  # lock is reentered by writer itself, its changes are not finished
+                raise ValueError('snapshot view is not available inside of writing()')
+            view = self._view
+            version = self._write_lock.get_version()
+            if view is None or view.get_version() != version:
+                view = cc.GraphView.build(self, version, base=view, touched_names=self._touched_names)
+                self._touched_names = dict()
+                self._view = view
+        finally:
+            lock.release()
+        return view
+
+    def is_sharing_edges(self) -> bool:
+        return self._share_edges
+
+    def share_link_edges(self, nodes: Optional[Iterable] = None) -> Native:
+        if nodes is None:
+            nodes = self.get_nodes_iter()
+        edges = self.get_edges_dict()
+        for node in nodes:
+            for link in node.get_all_links_iter():
+                edge = link.get_edge()
+                shared_edge = edges.get(edge.get_name_tuple())
+                if shared_edge is not None and shared_edge is not edge:
+                    link.set_edge(shared_edge)
+        return self
+
+    def is_batch_mode(self) -> bool:
+        return self._pending_nodes is not None
+
+    def has_pending_name(self, name: Name) -> bool:
+        return name in self._pending_names
+
+    def add_pending_node(self, node: NodeInterface) -> Native:
+        assert self.is_batch_mode(), 'add_pending_node() is available in batch mode only'
+        self._pending_nodes.append(node)
+        self._pending_names.setdefault(node.get_name(), node)
+        for title in node.get_titles():
+            self._pending_titles.setdefault(title, node)
+        return self
+
+    def reset_pending(self) -> tuple:
+        pending = self._pending_nodes or list(), self._pending_edges
+        self._pending_nodes = None
+        self._pending_names = dict()
+        self._pending_titles = dict()
+        self._pending_edges = list()
+        return pending
+
+    @contextmanager
+    def batch(self):
+        with self._write_lock:  # pending state belongs to one writer, readers see whole batch at once
+            if self.is_batch_mode():  # nested batch is flushed by the outer one
+                yield self
+                return
+            self._pending_nodes = list()
+            try:
+                yield self
+            except BaseException:
+                self.reset_pending()
+                raise
+            self.flush_pending()
+
+    def flush_pending(self) -> Native:
+        pending_nodes, pending_edges = self.reset_pending()
+        nodes = self.get_nodes_dict()
+        merged_nodes = list()
+        for node in pending_nodes:
+            name = node.get_name()
+            registered_node = nodes.get(name)
+            if registered_node is None:
+                self.add_node(node)
+            elif registered_node is not node:
+                merged_nodes.append((registered_node, node))
+        for registered_node, node in merged_nodes:
+            registered_node.merge_node(node)
+        edges = dict()
+        for edge in pending_edges:
+            edges[id(edge)] = edge
+        for node in pending_nodes:
+            for link in node.get_all_links_iter():
+                edge = link.get_edge()
+                edges[id(edge)] = edge
+        for edge in edges.values():
+            node_a, node_b = edge.get_nodes()
+            registered_a = nodes.get(node_a.get_name(), node_a)
+            registered_b = nodes.get(node_b.get_name(), node_b)
+            if registered_a is not node_a or registered_b is not node_b:
+                edge.set_nodes(registered_a, registered_b)
+        for edge in pending_edges:
+            self.add_edge(edge)
+        if self.is_sharing_edges():
+            self.share_link_edges(pending_nodes)
         return self
 
+    def bulk_load(self, objects: Iterable) -> Native:
+        with self.batch():
+            for obj in objects:
+                assert isinstance(obj, dict), 'expected dict, got {}'.format(obj)
+                cs.Node.build_node_from_dict(obj, graph=self)
+        return self
+
+    def save_snapshot(self, path: str) -> Native:
+        sn.save_snapshot(self, path)
+        return self
+
+    def load_snapshot(self, path: str) -> Native:
+        return sn.load_snapshot(self, path)
+
+    def get_page_records(self) -> ex.PageRecords:
+        if self._page_records is None:
+            self._page_records = ex.PageRecords(self)
+        return self._page_records
+
+    def export_site(
+            self,
+            out_dir: str,
+            fmt: str = 'md',
+            workers: Optional[int] = None,
+            incremental: bool = False,
+    ) -> int:
+        return ex.export_site(self, out_dir, fmt=fmt, workers=workers, incremental=incremental)
+
+    def get_memory_report(self) -> dict:
+        node_bytes, block_bytes, link_bytes = 0, 0, 0
+        link_ids, block_ids = set(), set()
+        edges = self.get_edges_dict()
+        if isinstance(edges, es.ColumnarEdgeStore):  # edges are built on demand, so all link edges are private
+            registered_edge_ids = set()
+        else:
+            registered_edge_ids = {id(e) for e in edges.values()}
+        for node in self.get_nodes_iter():
+            node_bytes += node.get_memory_size()
+            for block in node.get_content_blocks_list() + list(node.get_link_blocks_dict().values()):
+                if id(block) not in block_ids:
+                    block_ids.add(id(block))
+                    block_bytes += block.get_memory_size()
+            for link in node.get_all_links_iter():
+                if id(link) not in link_ids:
+                    link_ids.add(id(link))
+                    link_bytes += link.get_memory_size()
+                    edge = link.get_edge()
+                    if id(edge) not in registered_edge_ids:  # private copy of edge is owned by link
+                        link_bytes += edge.get_memory_size()
+        if isinstance(edges, es.ColumnarEdgeStore):
+            edge_bytes = edges.get_memory_size()
+        else:
+            edge_bytes = sum(edge.get_memory_size() + sys.getsizeof(k) for k, edge in edges.items())
+            edge_bytes += sys.getsizeof(edges)
+        index_bytes = sys.getsizeof(self._nodes) + sys.getsizeof(self._titles) + sys.getsizeof(self._shadowed_titles)
+        index_bytes += sys.getsizeof(self._adjacency)
+        for node_adjacency in self._adjacency.values():
+            index_bytes += sys.getsizeof(node_adjacency)
+            index_bytes += sum(sys.getsizeof(name_tuples) for name_tuples in node_adjacency.values())
+        node_count, edge_count, link_count = self.get_node_count(), self.get_edge_count(), len(link_ids)
+        return dict(
+            node_count=node_count,
+            edge_count=edge_count,
+            link_count=link_count,
+            block_count=len(block_ids),
+            node_bytes=node_bytes,
+            edge_bytes=edge_bytes,
+            link_bytes=link_bytes,
+            block_bytes=block_bytes,
+            index_bytes=index_bytes,
+            total_bytes=node_bytes + edge_bytes + link_bytes + block_bytes + index_bytes,
+            bytes_per_node=node_bytes // node_count if node_count else 0,
+            bytes_per_edge=edge_bytes // edge_count if edge_count else 0,
+            bytes_per_link=link_bytes // link_count if link_count else 0,
+        )
+
     def __repr__(self):
         return 'Graph({} nodes, {} edges)'.format(self.get_node_count(), self.get_edge_count())
 
@@ -1,13 +1,15 @@
 from typing import Optional, Iterable, Generator, Union, Any, NoReturn
+import hashlib
+import sys
 
 try:  # Assume we're a submodule in a package.
-    from utils import get_canonic_synonym
+    from utils import get_canonic_synonym, get_compiled_synonyms, MIN_ITEMS_FOR_SET
     from interfaces import GraphInterface, NodeInterface, EdgeInterface, LinkInterface, BlockInterface
     import type_enums as te
     import classes as cs
     import builders as bs
 except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
-    from ...utils import get_canonic_synonym
+    from ...utils import get_canonic_synonym, get_compiled_synonyms, MIN_ITEMS_FOR_SET
     from ...interfaces import GraphInterface, NodeInterface, EdgeInterface, LinkInterface, BlockInterface
     from ... import type_enums as te
     from ... import classes as cs
@@ -31,11 +33,19 @@ NODE_KEYS_SYNONYMS = (
     ('items', 'node', 'node', 'nodes', 'content', 'list', 'struct'),
     ('links', 'link'),
 )
+NODE_KEYS = get_compiled_synonyms(NODE_KEYS_SYNONYMS)
 IGNORE_KEYS = 'snippet', 'properties', 'url', 'author', 'year', 'org'
+FINGERPRINT_SIZE = 16
+FINGERPRINT_SEPARATOR = '\x00'
 KEYS_PRIMITIVE = 'title', 'info'
 
 
 class Node(NodeInterface):
+    __slots__ = (
+        '_graph', '_name', '_titles', '_title_set',
+        '_content_blocks', '_content_block_set', '_link_blocks', '_outgoing_links',
+    )
+
     def __init__(
             self,
             name: Name = None,
@@ -43,11 +53,20 @@ class Node(NodeInterface):
             content_blocks: Optional[list] = None,
             link_blocks: Optional[dict] = None,
             register: bool = True,
+            graph: Optional[GraphInterface] = None,
     ):
-        self._name = name
+        self._graph = cs.get_graph() if graph is None else graph
+        self._name = sys.intern(name) if isinstance(name, str) else name
         self._titles = titles or list()
+        self._title_set = None
         self._content_blocks = content_blocks or list()
+        self._content_block_set = None
         self._link_blocks = link_blocks or dict()
+        self._outgoing_links = dict()
+        for block in self._content_blocks:
+            self.add_block_links_to_index(block)
+        for block in self._link_blocks.values():
+            self.add_block_links_to_index(block)
         if register:
             self.register()
 
@@ -58,51 +77,112 @@ class Node(NodeInterface):
             return self.get_name() == cs.get_name(other)
 
     @staticmethod
-    def build_node_from_dict(obj: dict, register: bool = True, allow_merge: bool = True) -> NodeInterface:
+    def build_node_from_dict(
+            obj: dict,
+            register: bool = True,
+            allow_merge: bool = True,
+            graph: Optional[GraphInterface] = None,
+    ) -> NodeInterface:
         name = obj.get('id') or obj.get('name') or obj.get('title')
-        node = Node(name=name, register=False)
-        node.add_from_dict(obj)
-        if register:
-            return node.register(allow_merge=allow_merge)
-        else:
-            return node
+        node = Node(name=name, register=False, graph=graph)
+        with node.get_graph().writing():  # node and its links are added at once
+            node.add_from_dict(obj)
+            if register:
+                return node.register(allow_merge=allow_merge)
+            else:
+                return node
 
     def add_from_dict(self, obj: dict) -> Native:
         for k, v in obj.items():
             self.add_key_value(k, v)
         return self
 
-    @staticmethod
-    def get_graph() -> GraphInterface:
-        return cs.get_graph()
+    def get_graph(self) -> GraphInterface:
+        return self._graph
 
     def is_registered(self) -> bool:
         return self.get_graph().has_node(self)
 
+    def copy(self) -> Native:  # unregistered copy, later changes of node are not visible in it
+        return Node(
+            self._name,
+            titles=list(self.get_titles()),
+            content_blocks=[block.copy() for block in self.get_content_blocks_list()],
+            link_blocks={link_type: block.copy() for link_type, block in self.get_link_blocks_dict().items()},
+            register=False,
+            graph=self.get_graph(),
+        )
+
+    def touch(self) -> Native:
+        if self._name:  # changed node is copied by next snapshot view and reindexed by listeners of graph
+            self.get_graph().update_node(self)
+        return self
+
     def register(self, allow_merge: bool = True) -> Native:
-        print('Adding node {} for {}...         '.format(self.get_name(), str(self.get_graph())[:50]), end='\r')
-        node_name = self.get_name()
-        if self.get_graph().has_name(node_name):
-            if allow_merge:
-                return self.get_graph().get_node_by_name(node_name).merge_node(self)
+        graph = self.get_graph()
+        with graph.writing():
+            if graph.is_batch_mode():
+                node_name = self.get_name()
+                if not allow_merge and (graph.has_name(node_name) or graph.has_pending_name(node_name)):
+                    raise ValueError('node {} already registered in graph'.format(node_name))
+                graph.add_pending_node(self)
+                return self
+            print('Adding node {} for {}...         '.format(self.get_name(), str(self.get_graph())[:50]), end='\r')
+            node_name = self.get_name()
+            if self.get_graph().has_name(node_name):
+                if allow_merge:
+                    return self.get_graph().get_node_by_name(node_name).merge_node(self)
+                else:
+                    raise ValueError('node {} already registered in graph'.format(node_name))
             else:
-                raise ValueError('node {} already registered in graph'.format(node_name))
-        else:
-            self.get_graph().add_node(self)
-            return self
+                self.get_graph().add_node(self)
+                return self
 
     def merge_node(self, node: NodeInterface) -> Native:
         assert self.get_name() == node.get_name()
-        for title in node.get_titles():
-            self.add_title(title)
-        for block in node.get_content_links_iter():
-            self.add_content_block(block)
-        for link_type, block in node.get_link_blocks_dict().items():
-            self.add_link_block(block, link_type=link_type)
+        graph = self.get_graph()
+        with graph.writing():
+            for title in node.get_titles():
+                self.add_title(title)
+            for block in node.get_content_blocks_list():
+                self.add_content_block(block)
+            for link_type, block in node.get_link_blocks_dict().items():
+                self.add_link_block(block, link_type=link_type)
+            graph.notify('on_update_node', self)
         return self
 
+    def get_memory_size(self) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(self._titles) + sys.getsizeof(self._content_blocks)
+        size += sys.getsizeof(self._link_blocks) + sys.getsizeof(self._outgoing_links)
+        for container in self._title_set, self._content_block_set:
+            if container is not None:
+                size += sys.getsizeof(container)
+        for key, links in self._outgoing_links.items():
+            size += sys.getsizeof(key)
+            if isinstance(links, list):
+                size += sys.getsizeof(links)
+        return size
+
+    def get_fingerprint_parts(self) -> Generator:
+        yield 'name'
+        yield self.get_name(allow_use_hash=False) or ''
+        for title in self.get_titles():
+            yield 'title'
+            yield title
+        for block in self.get_content_blocks_list():
+            yield from block.get_fingerprint_parts()
+        link_blocks = self.get_link_blocks_dict()
+        for link_type in sorted(link_blocks, key=lambda t: t.value):
+            yield 'links'
+            yield link_type.value
+            yield from link_blocks[link_type].get_fingerprint_parts()
+
+    def get_fingerprint(self) -> str:
+        data = FINGERPRINT_SEPARATOR.join(self.get_fingerprint_parts()).encode('utf-8')
+        return hashlib.blake2b(data, digest_size=FINGERPRINT_SIZE).hexdigest()
+
     def get_hash(self):
-        return hash(str(self))
+        return int(self.get_fingerprint()[:16], 16)
 
     def get_name(self, allow_use_hash: bool = True) -> Name:
         name = self._name
@@ -119,7 +199,7 @@ class Node(NodeInterface):
                 self.get_graph().rename_item(self.get_name(), name)
             else:
                 raise ValueError('can not change registered id for {}'.format(self))
-        self._name = name
+        self._name = sys.intern(name) if isinstance(name, str) else name
         return self
 
     def get_titles(self) -> list:
@@ -132,9 +212,20 @@ class Node(NodeInterface):
         elif allow_use_name:
             return self.get_name()
 
+    def has_title(self, title: Title) -> bool:
+        titles = self.get_titles()
+        if self._title_set is None:
+            if len(titles) < MIN_ITEMS_FOR_SET:
+                return title in titles
+            self._title_set = set(titles)
+        return title in self._title_set
+
     def add_title(self, title: Title) -> Native:
-        if title not in self.get_titles():
+        if not self.has_title(title):
+            if self._title_set is not None:
+                self._title_set.add(title)
             self.get_titles().append(title)
+            self.get_graph().add_node_title(self, title)
         return self
 
     def add_block(self, block: Union[BlockInterface, dict]) -> Native:
@@ -178,7 +269,8 @@ class Node(NodeInterface):
         link_block = self.get_link_block_by_type(link_type, create_if_not_exists=True)
         assert isinstance(link_block, cs.Block)
         link_block.merge_block(block)
-        return self
+        self.add_block_links_to_index(block)
+        return self.touch()
 
     def build_empty_link_block_by_type(self, link_type: te.LinkType) -> BlockInterface:
         assert isinstance(link_type, te.LinkType)
@@ -199,7 +291,8 @@ class Node(NodeInterface):
         link_block.set_anchor(link_type.value)
         link_block.set_title(title)
         link_block.add_items(links)
-        return self
+        self.add_block_links_to_index(link_block)
+        return self.touch()
 
     def add_link_block_from_dict(self, obj: dict) -> Native:
         link_type_name = obj.get('type') or obj.get('link_type')
@@ -229,21 +322,33 @@ class Node(NodeInterface):
             assert isinstance(block, cs.Block)
             return block
 
+    def has_content_block(self, block: BlockInterface) -> bool:
+        content_blocks = self.get_content_blocks_list()
+        if self._content_block_set is None:
+            if len(content_blocks) < MIN_ITEMS_FOR_SET:
+                return any(i is block for i in content_blocks)
+            self._content_block_set = set(content_blocks)
+        return block in self._content_block_set
+
     def add_content_block(self, block: Union[BlockInterface, dict], allow_merge: bool = False) -> Native:
         if isinstance(block, dict):
             block = cs.Block.from_dict(block)
         elif isinstance(block, te.BlockType):
             block = cs.Block(block_type=block)
         assert isinstance(block, cs.Block)
-        if block not in self.get_content_blocks_list():
+        if not self.has_content_block(block):
+            if self._content_block_set is not None:
+                self._content_block_set.add(block)
             self.get_content_blocks_list().append(block)
+            self.add_block_links_to_index(block)
+            self.touch()
         return self
 
     def add_key_value(self, key: Key, value: Any) -> Native:
         if isinstance(value, dict):
             if 'type' in value:
                 key = value.get('type')
-        key = get_canonic_synonym(key, NODE_KEYS_SYNONYMS, skip_missing=True) or key
+        key = get_canonic_synonym(key, NODE_KEYS, skip_missing=True) or key
         if key in IGNORE_KEYS:
             return self
         if isinstance(value, PRIMITIVE_TYPES):
@@ -281,7 +386,7 @@ class Node(NodeInterface):
         return self
 
     def add_dict_value(self, key: Key, value: dict) -> Native:
-        key = get_canonic_synonym(key, NODE_KEYS_SYNONYMS, skip_missing=True) or key
+        key = get_canonic_synonym(key, NODE_KEYS, skip_missing=True) or key
         if key in KEYS_PRIMITIVE:
             string = ', '.join(['{}: {}'.format(k, v) for k, v in value.items()])
             return self.add_primitive_value(key, string)
@@ -313,6 +418,9 @@ class Node(NodeInterface):
         if is_current_block:
             assert isinstance(last_content_block, cs.Block)
             last_content_block.append_item(content_item)
+            if isinstance(content_item, cs.Link):
+                self.add_link_to_index(content_item)
+            self.touch()
         else:
             new_block = cs.Block(block_type=block_type, items=[content_item])
             self.add_content_block(new_block)
@@ -324,9 +432,10 @@ class Node(NodeInterface):
         link_block = self.get_link_block_by_type(link_type, create_if_not_exists=True)
         assert isinstance(link_block, cs.Block)
         link_block.append_item(link)
+        self.add_link_to_index(link)
         if register:
             self.get_graph().add_edge(link.get_edge(), if_not_exists=True)
-        return self
+        return self.touch()
 
     def add_link_by_type_and_target(
             self, link_type: Union[te.LinkType, str],
@@ -336,16 +445,19 @@ class Node(NodeInterface):
             allow_create_node: bool = True,
     ) -> Native:
         link_type = te.LinkType.get_type(link_type)
-        to_node = self.get_graph().get_node(target, create_if_not_exists=allow_create_node)
+        graph = self.get_graph()
+        if isinstance(target, str) and graph.is_resolving_closest():
+            target = graph.get_closest_node(target) or target
+        to_node = graph.get_node(target, create_if_not_exists=allow_create_node)
         link_item = cs.Link.build_link_from_nodes(from_node=self, to_node=to_node, link_type=link_type, caption=caption)
         self.add_outgoing_link(link_item, register=register)
         return self
 
     # deprecated (used in hierdoc)
     def add_link_by_name(self, name: Name, caption: Caption, link_type: te.LinkType, create_node: bool = False):
-        node = cs.get_graph().get_node(name)
+        node = self.get_graph().get_node(name)
         if create_node and not node:
-            node = cs.Node(name, [caption])
+            node = cs.Node(name, [caption], graph=self.get_graph())
         link = cs.Link.build_link_from_nodes(from_node=self, to_node=node, link_type=link_type, caption=caption)
         self.add_outgoing_link(link)
 
@@ -370,22 +482,56 @@ class Node(NodeInterface):
         yield from self.get_content_links_iter()
         yield from self.get_link_block_links_iter()
 
+    def add_link_to_index(self, link: LinkInterface) -> Native:
+        assert isinstance(link, cs.Link)
+        key = link.get_target_name(), link.get_type()
+        links = self._outgoing_links.get(key)
+        if links is None:  # single link is stored as is, list is allocated for the second one only
+            self._outgoing_links[key] = link
+        elif isinstance(links, list):
+            if not any(i is link for i in links):
+                links.append(link)
+        elif links is not link:
+            self._outgoing_links[key] = [links, link]
+        return self
+
+    def add_block_links_to_index(self, block: BlockInterface) -> Native:
+        for link in block.get_outgoing_links_iter():
+            self.add_link_to_index(link)
+        return self
+
+    def get_links_index(self) -> dict:
+        return self._outgoing_links
+
     def get_link(self, node: NodeInterface, link_type: te.LinkType) -> LinkInterface:
         name = cs.get_name(node)
-        for link in self.get_all_links_iter():
-            assert isinstance(link, cs.Link)
-            if link.get_target_node().get_name() == name and link.get_type() == link_type:
-                return link
+        links = self._outgoing_links.get((name, link_type))
+        if isinstance(links, list):
+            return links[0]
+        else:
+            return links
 
     def get_outgoing_links_iter(self) -> Generator:
         for block in self.get_content_blocks_list():
             yield from block.get_outgoing_links_iter()
         yield from self.get_all_links_iter()
 
+    def rename_link_target(self, old_name: Name, new_name: Name) -> Native:
+        outgoing_links = self._outgoing_links
+        for link_type in te.LinkType:
+            links = outgoing_links.pop((old_name, link_type), None)
+            if links is not None:
+                outgoing_links[new_name, link_type] = links
+        for block in self.get_content_blocks_list() + list(self.get_link_blocks_dict().values()):
+            for link in block.get_outgoing_links_iter():
+                link.reset_key()  # cached key has old name of source or target
+            block.reset_item_set()
+        return self
+
     def has_outgoing_link_to_node(self, node: NodeInterface) -> bool:
-        for link in self.get_all_links_iter():
-            assert isinstance(link, cs.Link)
-            if link.get_target_node() == node:
+        name = cs.get_name(node)
+        for link_type in te.LinkType:
+            if (name, link_type) in self._outgoing_links:
                 return True
         return False
 
@@ -399,7 +545,7 @@ class Node(NodeInterface):
         return other and self.has_outgoing_link_to_node(other)
 
     def get_incoming_edges(self) -> Iterable:
-        return cs.get_graph().get_incoming_edges(self)
+        return self.get_graph().get_incoming_edges(self)
 
     def get_incoming_links(self) -> Iterable:
         for edge in self.get_incoming_edges():
@@ -0,0 +1,197 @@
+from typing import Optional, Union
+
+try:  # Assume we're a submodule in a package.
+    from interfaces import GraphInterface, NodeInterface
+    import type_enums as te
+    import classes as cs
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...interfaces import GraphInterface, NodeInterface
+    from ... import type_enums as te
+    from ... import classes as cs
+
+Name = str
+ComponentId = int
+
+PREREQ_LINK_TYPE = te.LinkType.Prereq
+PREREQ_EDGE_TYPE = PREREQ_LINK_TYPE.get_edge_type()
+MAX_CACHED_CLOSURE_SIZE = 1 << 22  # total count of component ids in memoised closures
+
+
+def get_prerequisites_dict(graph: GraphInterface) -> dict:
+    adjacency = graph.get_adjacency_dict()
+    names = [n for n in graph.get_nodes_dict() if n in adjacency]  # order of nodes makes components stable
+    if len(names) < len(adjacency):
+        names += [n for n in adjacency if n not in graph.get_nodes_dict()]
+    prerequisites = dict()
+    for name in names:
+        name_tuples = adjacency[name].get(PREREQ_EDGE_TYPE)
+        if name_tuples:
+            prerequisites[name] = [b_name for a_name, b_name, _ in name_tuples if a_name == name]
+    return prerequisites
+
+
+def get_strong_components(prerequisites: dict) -> list:
+    # iterative Tarjan, components are emitted after all components they depend on
+    indexes, low_links = dict(), dict()
+    stack, on_stack = list(), set()
+    components = list()
+    for root in prerequisites:
+        if root in indexes:
+            continue
+        indexes[root] = low_links[root] = len(indexes)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(prerequisites.get(root, ())))]
+        while work:
+            name, successors = work[-1]
+            for successor in successors:
+                if successor not in indexes:
+                    indexes[successor] = low_links[successor] = len(indexes)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(prerequisites.get(successor, ()))))
+                    break
+                elif successor in on_stack and indexes[successor] < low_links[name]:
+                    low_links[name] = indexes[successor]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low_links[name] < low_links[parent]:
+                        low_links[parent] = low_links[name]
+                if low_links[name] == indexes[name]:
+                    component = list()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == name:
+                            break
+                    component.reverse()
+                    components.append(component)
+    return components
+
+
+class PrerequisitePlan:
+    def __init__(self, graph: GraphInterface):
+        self._graph = graph
+        self._version = None
+        self._components = list()
+        self._component_ids = dict()
+        self._component_prerequisites = list()
+        self._ranks = list()
+        self._positions = list()
+        self._cycles = set()
+        self._closures = dict()
+        self._closure_size = 0
+
+    def get_graph(self) -> GraphInterface:
+        return self._graph
+
+    def is_actual(self) -> bool:
+        return self._version == self.get_graph().get_edge_version(PREREQ_EDGE_TYPE)
+
+    def refresh(self):
+        if not self.is_actual():
+            self.build()
+        return self
+
+    def build(self):
+        graph = self.get_graph()
+        version = graph.get_edge_version(PREREQ_EDGE_TYPE)
+        prerequisites = get_prerequisites_dict(graph)
+        components = get_strong_components(prerequisites)
+        component_ids = {name: cid for cid, component in enumerate(components) for name in component}
+        component_prerequisites, ranks, cycles = list(), list(), set()
+        for cid, component in enumerate(components):
+            prerequisite_ids = dict()
+            has_loop = False
+            for name in component:
+                for prerequisite in prerequisites.get(name, ()):
+                    prerequisite_id = component_ids[prerequisite]
+                    if prerequisite_id == cid:
+                        has_loop = True
+                    else:
+                        prerequisite_ids[prerequisite_id] = None
+            if has_loop:
+                cycles.add(cid)
+            component_prerequisites.append(tuple(prerequisite_ids))
+            ranks.append(max((ranks[i] + 1 for i in prerequisite_ids), default=0))  # prerequisites are built before
+        order = sorted(range(len(components)), key=lambda i: (ranks[i], i))
+        positions = [0] * len(components)
+        for position, cid in enumerate(order):
+            positions[cid] = position
+        self._components = components
+        self._component_ids = component_ids
+        self._component_prerequisites = component_prerequisites
+        self._ranks = ranks
+        self._positions = positions
+        self._cycles = cycles
+        self._closures = dict()
+        self._closure_size = 0
+        self._version = version
+        return self
+
+    def get_component_id(self, node: Union[NodeInterface, Name]) -> Optional[ComponentId]:
+        name = node if isinstance(node, Name) else cs.get_name(node)
+        return self.refresh()._component_ids.get(name)
+
+    def get_cycles(self) -> list:
+        return [list(self._components[cid]) for cid in sorted(self.refresh()._cycles)]
+
+    def has_cycles(self) -> bool:
+        return bool(self.refresh()._cycles)
+
+    def get_rank(self, node: Union[NodeInterface, Name]) -> int:
+        cid = self.get_component_id(node)
+        return 0 if cid is None else self._ranks[cid]
+
+    def get_topological_order(self) -> list:
+        self.refresh()
+        order = sorted(range(len(self._components)), key=self._positions.__getitem__)
+        return [name for cid in order for name in self._components[cid]]
+
+    def get_closure(self, cid: ComponentId) -> tuple:
+        closures = self._closures
+        closure = closures.get(cid)
+        if closure is not None:
+            return closure
+        component_prerequisites = self._component_prerequisites
+        visited = set()
+        stack = list(component_prerequisites[cid])
+        while stack:
+            current = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            cached = closures.get(current)
+            if cached is not None:  # memoised closure of prerequisite is taken as a whole
+                visited.update(cached)
+            else:
+                stack.extend(component_prerequisites[current])
+        closure = tuple(sorted(visited, key=self._positions.__getitem__))
+        self._closure_size += len(closure)
+        if self._closure_size > MAX_CACHED_CLOSURE_SIZE:
+            closures.clear()
+            self._closure_size = len(closure)
+        closures[cid] = closure
+        return closure
+
+    def get_prerequisite_names(self, node: Union[NodeInterface, Name]) -> set:
+        cid = self.get_component_id(node)
+        if cid is None:
+            return set()
+        names = {name for i in self.get_closure(cid) for name in self._components[i]}
+        if cid in self._cycles:  # members of cycle are prerequisites of each other
+            names.update(self._components[cid])
+        return names
+
+    def get_learning_path(self, target: Union[NodeInterface, Name]) -> list:
+        name = target if isinstance(target, Name) else cs.get_name(target)
+        cid = self.get_component_id(name)
+        if cid is None:
+            return [name]
+        components = self._components
+        path = [n for i in self.get_closure(cid) for n in components[i]]
+        path += components[cid]
+        return path
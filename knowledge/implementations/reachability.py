@@ -0,0 +1,247 @@
+from typing import Union
+
+try:  # Assume we're a submodule in a package.
+    from interfaces import GraphInterface, NodeInterface
+    import type_enums as te
+    import classes as cs
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...interfaces import GraphInterface, NodeInterface
+    from ... import type_enums as te
+    from ... import classes as cs
+
+Name = str
+NameTuple = tuple  # (a_name, b_name, edge_type_str)
+
+HIERARCHY_EDGE_TYPE = te.EdgeType.ParentChild  # side a is child, side b is parent
+HIERARCHY_EDGE_TYPE_STR = HIERARCHY_EDGE_TYPE.value
+MIN_REBUILD_SIZE = 64  # incremental changes are not worth a rebuild while index is small
+
+
+def get_parent_names(adjacency: dict, name: Name) -> list:
+    name_tuples = adjacency.get(name, dict()).get(HIERARCHY_EDGE_TYPE, ())
+    return [b_name for a_name, b_name, _ in name_tuples if a_name == name]
+
+
+def get_child_names(adjacency: dict, name: Name) -> list:
+    name_tuples = adjacency.get(name, dict()).get(HIERARCHY_EDGE_TYPE, ())
+    return [a_name for a_name, b_name, _ in name_tuples if b_name == name]
+
+
+def get_name_and_descendant_names(adjacency: dict, name: Name) -> list:
+    names = [name]
+    visited = {name}
+    for current in names:  # list grows while iterating, so it is a breadth-first walk
+        for child in get_child_names(adjacency, current):
+            if child not in visited:
+                visited.add(child)
+                names.append(child)
+    return names
+
+
+class ReachabilityIndex:
+    # interval labels of spanning forest answer for tree paths,
+    # ancestors reached through other parents are kept per node in extra sets,
+    # nodes attached to forest after build have no labels and are checked by walk up to labeled ones
+    def __init__(self, graph: GraphInterface):
+        self._graph = graph
+        self._graph_versions = graph.get_edge_versions_dict()  # checked on every query without method calls
+        self._version = None
+        self._labels = dict()
+        self._tree_parents = dict()
+        self._extra_ancestors = dict()
+        self._incremental_size = 0  # attached nodes and extra entries added since build
+        graph.add_listener(self)
+
+    def get_graph(self) -> GraphInterface:
+        return self._graph
+
+    def get_graph_version(self) -> int:
+        return self.get_graph().get_edge_version(HIERARCHY_EDGE_TYPE)
+
+    def is_actual(self) -> bool:
+        return self._version == self.get_graph_version()
+
+    def refresh(self):
+        if self._version is None or not self.is_actual():
+            self.build()
+        return self
+
+    def get_hierarchy_names(self) -> list:
+        graph = self.get_graph()
+        adjacency = graph.get_adjacency_dict()
+        nodes = graph.get_nodes_dict()
+        names = [n for n in nodes if HIERARCHY_EDGE_TYPE in adjacency.get(n, ())]  # order of nodes makes labels stable
+        names += [n for n, a in adjacency.items() if HIERARCHY_EDGE_TYPE in a and n not in nodes]
+        return names
+
+    def build(self):
+        adjacency = self.get_graph().get_adjacency_dict()
+        names = self.get_hierarchy_names()
+        labels, tree_parents = dict(), dict()
+        self._labels, self._tree_parents, self._extra_ancestors = labels, tree_parents, dict()
+        counter = 0
+        roots = [n for n in names if not get_parent_names(adjacency, n)]
+        for root in roots + names:  # nodes in parentless cycles are reached from names
+            if root in labels:
+                continue
+            labels[root] = counter
+            counter += 1
+            work = [(root, iter(get_child_names(adjacency, root)))]
+            while work:
+                name, children = work[-1]
+                for child in children:
+                    if child not in labels:
+                        labels[child] = counter
+                        counter += 1
+                        tree_parents[child] = name
+                        work.append((child, iter(get_child_names(adjacency, child))))
+                        break
+                else:
+                    work.pop()
+                    labels[name] = labels[name], counter
+                    counter += 1
+        for name in names:
+            for parent in get_parent_names(adjacency, name):
+                if tree_parents.get(name) != parent:
+                    self.add_extra_parent(name, parent)
+        self._version = self.get_graph_version()
+        self._incremental_size = 0
+        return self
+
+    def get_extra_ancestor_count(self) -> int:
+        return sum(map(len, self._extra_ancestors.values()))
+
+    def is_tree_descendant(self, name: Name, ancestor: Name) -> bool:
+        labels, tree_parents = self._labels, self._tree_parents
+        while name not in labels:
+            name = tree_parents.get(name)
+            if name is None:
+                return False
+            if name == ancestor:
+                return True
+        ancestor_label = labels.get(ancestor)
+        if ancestor_label is None:  # labeled node is never below an attached one
+            return False
+        label = labels[name]
+        return ancestor_label[0] < label[0] and label[1] < ancestor_label[1]
+
+    def get_tree_ancestor_names(self, name: Name) -> list:
+        tree_parents = self._tree_parents
+        names = list()
+        parent = tree_parents.get(name)
+        while parent is not None:
+            names.append(parent)
+            parent = tree_parents.get(parent)
+        return names
+
+    def add_extra_ancestors(self, name: Name, gained: set):
+        adjacency = self.get_graph().get_adjacency_dict()
+        for descendant in get_name_and_descendant_names(adjacency, name):
+            new_ancestors = [a for a in gained if not self.is_tree_descendant(descendant, a)]
+            if new_ancestors:
+                extra = self._extra_ancestors.setdefault(descendant, set())
+                count = len(extra)
+                extra.update(new_ancestors)
+                self._incremental_size += len(extra) - count
+        return self
+
+    def add_extra_parent(self, name: Name, parent: Name):
+        gained = self.get_ancestor_set(parent, refresh=False)
+        gained.add(parent)
+        return self.add_extra_ancestors(name, gained)
+
+    def is_attachable(self, name: Name, parent: Name) -> bool:
+        # new leaf can become tree child, its ancestors are exactly ones of its parent
+        if name in self._labels or name in self._tree_parents or name == parent:
+            return False
+        return not get_child_names(self.get_graph().get_adjacency_dict(), name)
+
+    def attach(self, name: Name, parent: Name):
+        self._tree_parents[name] = parent
+        self._incremental_size += 1
+        extra = self._extra_ancestors.get(parent)
+        if extra:  # extra set of parent already covers ancestors reached through its tree ancestors
+            self._extra_ancestors[name] = set(extra)
+            self._incremental_size += len(extra)
+        return self
+
+    def is_oversized(self) -> bool:
+        return self._incremental_size > max(MIN_REBUILD_SIZE, len(self._labels))
+
+    def reset_extra_ancestors(self, name: Name):
+        adjacency = self.get_graph().get_adjacency_dict()
+        for descendant in get_name_and_descendant_names(adjacency, name):
+            ancestors = set()
+            stack = get_parent_names(adjacency, descendant)
+            while stack:
+                current = stack.pop()
+                if current not in ancestors:
+                    ancestors.add(current)
+                    stack.extend(get_parent_names(adjacency, current))
+            extra = {a for a in ancestors if not self.is_tree_descendant(descendant, a)}
+            if extra:
+                self._extra_ancestors[descendant] = extra
+            else:
+                self._extra_ancestors.pop(descendant, None)
+        return self
+
+    def is_updatable(self) -> bool:
+        # index was actual before the single change that has just been made
+        return self._version is not None and self._version + 1 == self.get_graph_version()
+
+    def on_add_edge(self, name_tuple: NameTuple):
+        if name_tuple[2] != HIERARCHY_EDGE_TYPE_STR:
+            return
+        name, parent = name_tuple[0], name_tuple[1]
+        if self.is_updatable():
+            if self.is_attachable(name, parent):
+                self.attach(name, parent)
+            else:
+                self.add_extra_parent(name, parent)
+            # rebuild is deferred to next request, so its cost is amortized over incremental changes
+            self._version = None if self.is_oversized() else self.get_graph_version()
+        else:
+            self._version = None
+
+    def on_drop_edge(self, name_tuple: NameTuple):
+        if name_tuple[2] != HIERARCHY_EDGE_TYPE_STR:
+            return
+        name, parent = name_tuple[0], name_tuple[1]
+        if self.is_updatable() and self._tree_parents.get(name) != parent:
+            self.reset_extra_ancestors(name)
+            self._version = self.get_graph_version()
+        else:  # spanning forest has changed, index is rebuilt on next request
+            self._version = None
+
+    def on_rename_node(self, old_name: Name, new_name: Name):
+        self._version = None
+
+    def on_clear(self):
+        self._version = None
+
+    def get_ancestor_set(self, node: Union[NodeInterface, Name], refresh: bool = True) -> set:
+        if refresh:
+            self.refresh()
+        name = node if isinstance(node, Name) else cs.get_name(node)
+        ancestors = set(self.get_tree_ancestor_names(name))
+        extra = self._extra_ancestors.get(name)
+        if extra:
+            ancestors.update(extra)
+        return ancestors
+
+    def is_descendant(self, node: Union[NodeInterface, Name], ancestor: Union[NodeInterface, Name]) -> bool:
+        if self._version != self._graph_versions.get(HIERARCHY_EDGE_TYPE, 0):
+            self.build()
+        name = node if isinstance(node, Name) else cs.get_name(node)
+        ancestor_name = ancestor if isinstance(ancestor, Name) else cs.get_name(ancestor)
+        labels = self._labels
+        label = labels.get(name)
+        ancestor_label = labels.get(ancestor_name)
+        if label is None:
+            if self.is_tree_descendant(name, ancestor_name):
+                return True
+        elif ancestor_label is not None:
+            if ancestor_label[0] < label[0] and label[1] < ancestor_label[1]:
+                return True
+        extra = self._extra_ancestors.get(name)
+        return extra is not None and ancestor_name in extra
@@ -0,0 +1,203 @@
+from typing import Optional, Generator
+from operator import itemgetter
+import heapq
+import marshal
+import math
+import zlib
+import os
+import re
+
+try:  # Assume we're a submodule in a package.
+    from utils import transliterate
+    from interfaces import GraphInterface, NodeInterface
+    import type_enums as te
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...utils import transliterate
+    from ...interfaces import GraphInterface, NodeInterface
+    from ... import type_enums as te
+
+Name = str
+Term = str
+
+TOKEN_PATTERN = re.compile(r'\w+')
+TEXT_BLOCK_TYPE = te.BlockType.Info
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_LIMIT = 10
+FORMAT_VERSION = 1
+COMPRESSION_LEVEL = 1
+
+
+def get_terms(text: str) -> list:
+    return TOKEN_PATTERN.findall(transliterate(text.lower()))
+
+
+def get_node_texts_iter(node: NodeInterface) -> Generator:
+    for title in node.get_titles():
+        if isinstance(title, str):
+            yield title
+    for block in node.get_content_blocks_list():
+        if block.get_block_type() == TEXT_BLOCK_TYPE:
+            for item in block.get_items():
+                if isinstance(item, str):
+                    yield item
+    for link in node.get_all_links_iter():
+        caption = link.get_caption()
+        if isinstance(caption, str):
+            yield caption
+
+
+class SearchIndex:
+    def __init__(self, graph: GraphInterface):
+        self._graph = graph
+        self._postings = dict()  # term -> {name: term frequency}
+        self._doc_terms = dict()  # name -> terms, to remove document without its previous text
+        self._doc_lengths = dict()
+        self._total_length = 0
+        self._dirty_names = dict()
+        self._is_built = False
+        graph.add_listener(self)
+
+    def get_graph(self) -> GraphInterface:
+        return self._graph
+
+    def get_document_count(self) -> int:
+        return len(self.refresh()._doc_lengths)
+
+    def get_term_count(self) -> int:
+        return len(self.refresh()._postings)
+
+    def clear(self):
+        self._postings = dict()
+        self._doc_terms = dict()
+        self._doc_lengths = dict()
+        self._total_length = 0
+        self._dirty_names = dict()
+        return self
+
+    def build(self):
+        self.clear()
+        for name, node in self.get_graph().get_nodes_dict().items():
+            self.add_document(name, node)
+        self._is_built = True
+        return self
+
+    def refresh(self):
+        if not self._is_built:
+            return self.build()
+        if self._dirty_names:
+            nodes = self.get_graph().get_nodes_dict()
+            dirty_names, self._dirty_names = self._dirty_names, dict()
+            for name in dirty_names:
+                self.remove_document(name)
+                node = nodes.get(name)
+                if node is not None:
+                    self.add_document(name, node)
+        return self
+
+    def add_document(self, name: Name, node: NodeInterface):
+        frequencies = dict()
+        length = 0
+        for text in get_node_texts_iter(node):
+            for term in get_terms(text):
+                frequencies[term] = frequencies.get(term, 0) + 1
+                length += 1
+        postings = self._postings
+        for term, frequency in frequencies.items():
+            term_postings = postings.get(term)
+            if term_postings is None:
+                postings[term] = {name: frequency}
+            else:
+                term_postings[name] = frequency
+        self._doc_terms[name] = tuple(frequencies)
+        self._doc_lengths[name] = length
+        self._total_length += length
+        return self
+
+    def remove_document(self, name: Name):
+        terms = self._doc_terms.pop(name, None)
+        if terms is None:
+            return self
+        postings = self._postings
+        for term in terms:
+            term_postings = postings[term]
+            del term_postings[name]
+            if not term_postings:
+                del postings[term]
+        self._total_length -= self._doc_lengths.pop(name)
+        return self
+
+    def update_node(self, node: NodeInterface):
+        if self._is_built:  # text is read on next query, when node is filled
+            self._dirty_names[node.get_name()] = None
+        return self
+
+    def on_add_node(self, node: NodeInterface):
+        self.update_node(node)
+
+    def on_update_node(self, node: NodeInterface):
+        self.update_node(node)
+
+    def on_rename_node(self, old_name: Name, new_name: Name):
+        if self._is_built:
+            self._dirty_names[old_name] = None
+            self._dirty_names[new_name] = None
+
+    def on_clear(self):
+        self.clear()
+
+    def search(self, query: str, limit: Optional[int] = DEFAULT_LIMIT) -> list:
+        self.refresh()
+        document_count = len(self._doc_lengths)
+        if not document_count:
+            return list()
+        doc_lengths = self._doc_lengths
+        length_factor = BM25_K1 * BM25_B * document_count / (self._total_length or 1)
+        constant_factor = BM25_K1 * (1 - BM25_B)
+        scores = dict()
+        for term in dict.fromkeys(get_terms(query)):
+            term_postings = self._postings.get(term)
+            if not term_postings:
+                continue
+            df = len(term_postings)
+            idf = math.log(1 + (document_count - df + 0.5) / (df + 0.5))
+            weight = idf * (BM25_K1 + 1)
+            for name, tf in term_postings.items():
+                score = weight * tf / (tf + constant_factor + length_factor * doc_lengths[name])
+                scores[name] = scores.get(name, 0) + score
+        if limit is None:
+            return sorted(scores.items(), key=itemgetter(1), reverse=True)
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+    def save(self, path: str):
+        self.refresh()
+        payload = zlib.compress(marshal.dumps((FORMAT_VERSION, self._doc_lengths, self._postings)), COMPRESSION_LEVEL)
+        tmp_path = '{}.tmp'.format(path)
+        with open(tmp_path, 'wb') as file_holder:
+            file_holder.write(payload)
+        os.replace(tmp_path, path)
+        return self
+
+    def load(self, path: str):
+        with open(path, 'rb') as file_holder:
+            payload = file_holder.read()
+        try:
+            data = marshal.loads(zlib.decompress(payload))
+        except (ValueError, EOFError, TypeError, zlib.error) as e:
+            raise ValueError('search index {} is corrupted: {}'.format(path, e))
+        if not isinstance(data, tuple) or len(data) != 3 or data[0] != FORMAT_VERSION:
+            raise ValueError('search index {} has unsupported format'.format(path))
+        _, doc_lengths, postings = data
+        doc_terms = {name: list() for name in doc_lengths}
+        for term, term_postings in postings.items():
+            for name in term_postings:
+                doc_terms[name].append(term)
+        self._postings = postings
+        self._doc_terms = {name: tuple(terms) for name, terms in doc_terms.items()}
+        self._doc_lengths = doc_lengths
+        self._total_length = sum(doc_lengths.values())
+        self._is_built = True
+        nodes = self.get_graph().get_nodes_dict()
+        self._dirty_names = {n: None for n in nodes if n not in doc_lengths}  # saved for other state of graph
+        self._dirty_names.update((n, None) for n in doc_lengths if n not in nodes)
+        return self
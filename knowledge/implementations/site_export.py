@@ -0,0 +1,203 @@
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+import tempfile
+import json
+import os
+
+try:  # Assume we're a submodule in a package.
+    from utils import get_page_filename
+    from interfaces import GraphInterface, NodeInterface
+    from content.implementations import page as pg
+    import classes as cs
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...utils import get_page_filename
+    from ...interfaces import GraphInterface, NodeInterface
+    from ...content.implementations import page as pg
+    from ... import classes as cs
+
+Name = str
+
+FORMATS = 'md', 'html'
+CHUNKS_PER_WORKER = 8  # smaller chunks even out workers on pages of different size
+WRITE_BUFFER_SIZE = 1 << 16
+MIN_PAGES_FOR_POOL = 256  # fewer pages are rendered faster than workers load the snapshot
+MANIFEST_FILENAME = '.manifest.json'
+MANIFEST_VERSION = 1
+
+WORKER_GRAPH = None  # graph loaded from snapshot once per worker process
+
+
+def write_page(node: NodeInterface, out_dir: str, fmt: str) -> str:
+    filename = get_page_filename(node.get_name(), fmt)
+    page = node.get_page()
+    with open(os.path.join(out_dir, filename), 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as file_holder:
+        if fmt == 'md':
+            page.write_markdown(file_holder)
+        elif fmt == 'html':
+            page.write_html(file_holder)
+        else:
+            raise ValueError('expected format in {}, got {}'.format(FORMATS, fmt))
+    return filename
+
+
+def write_pages(graph: GraphInterface, names, out_dir: str, fmt: str) -> int:
+    nodes = graph.get_nodes_dict()
+    for name in names:
+        write_page(nodes[name], out_dir, fmt)
+    return len(names)
+
+
+def init_worker(snapshot_path: str):
+    global WORKER_GRAPH
+    WORKER_GRAPH = cs.Graph().load_snapshot(snapshot_path)
+
+
+def write_worker_pages(names: list, out_dir: str, fmt: str) -> int:
+    return write_pages(WORKER_GRAPH, names, out_dir, fmt)
+
+
+def write_pages_in_pool(graph: GraphInterface, names: list, out_dir: str, fmt: str, workers: int) -> int:
+    chunk_size = -(-len(names) // (workers * CHUNKS_PER_WORKER))
+    file_descriptor, snapshot_path = tempfile.mkstemp(suffix='.snapshot')
+    os.close(file_descriptor)
+    try:
+        graph.save_snapshot(snapshot_path)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(snapshot_path,)) as pool:
+            futures = [
+                pool.submit(write_worker_pages, names[start:start + chunk_size], out_dir, fmt)
+                for start in range(0, len(names), chunk_size)
+            ]
+            return sum(f.result() for f in futures)
+    finally:
+        os.remove(snapshot_path)
+
+
+def read_manifest(out_dir: str, fmt: str) -> dict:
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILENAME), encoding='utf-8') as file_holder:
+            manifest = json.load(file_holder)
+    except (OSError, ValueError):
+        return dict()
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION or manifest.get('format') != fmt:
+        return dict()
+    return manifest.get('pages', dict())
+
+
+def write_manifest(out_dir: str, fmt: str, pages: dict):
+    path = os.path.join(out_dir, MANIFEST_FILENAME)
+    tmp_path = '{}.tmp'.format(path)
+    with open(tmp_path, 'w', encoding='utf-8') as file_holder:
+        json.dump(dict(version=MANIFEST_VERSION, format=fmt, pages=pages), file_holder)
+    os.replace(tmp_path, path)
+
+
+class PageRecords:
+    # filename and fingerprint of page by node name and format, kept until node or its neighbour is changed,
+    # because pages show titles of neighbours
+    def __init__(self, graph: GraphInterface):
+        self._graph = graph
+        self._records = dict()
+        self._render_version = pg.RENDER_VERSION
+        graph.add_listener(self)
+
+    def get_graph(self) -> GraphInterface:
+        return self._graph
+
+    def get_record_count(self) -> int:
+        return len(self._records)
+
+    def get_page_record(self, name: Name, node: NodeInterface, fmt: str) -> list:
+        if self._render_version != pg.RENDER_VERSION:
+            self.clear()
+            self._render_version = pg.RENDER_VERSION
+        records_by_format = self._records.get(name)
+        if records_by_format is None:
+            records_by_format = self._records[name] = dict()
+        page_record = records_by_format.get(fmt)
+        if page_record is None:
+            page_record = [get_page_filename(name, fmt), node.get_page().get_fingerprint(fmt)]
+            records_by_format[fmt] = page_record
+        return page_record
+
+    def clear(self):
+        self._records = dict()
+        return self
+
+    def reset_node(self, name: Name):
+        records = self._records
+        records.pop(name, None)
+        for a_name, b_name, _ in self.get_graph().get_edge_name_tuples_for_node(name):
+            records.pop(a_name, None)
+            records.pop(b_name, None)
+        return self
+
+    def on_add_node(self, node: NodeInterface):
+        self.reset_node(node.get_name())
+
+    def on_update_node(self, node: NodeInterface):
+        self.reset_node(node.get_name())
+
+    def on_rename_node(self, old_name: Name, new_name: Name):
+        self._records.pop(old_name, None)
+        self.reset_node(new_name)
+
+    def on_add_edge(self, name_tuple: tuple):
+        self._records.pop(name_tuple[0], None)
+        self._records.pop(name_tuple[1], None)
+
+    def on_drop_edge(self, name_tuple: tuple):
+        self.on_add_edge(name_tuple)
+
+    def on_clear(self):
+        self.clear()
+
+
+def get_changed_pages(graph: GraphInterface, out_dir: str, fmt: str, old_pages: dict) -> tuple:
+    pages = dict()
+    changed_names = list()
+    page_records = graph.get_page_records()
+    for name, node in graph.get_nodes_dict().items():
+        page_record = page_records.get_page_record(name, node, fmt)
+        pages[name] = page_record
+        if old_pages.get(name) != page_record or not os.path.exists(os.path.join(out_dir, page_record[0])):
+            changed_names.append(name)
+    return pages, changed_names
+
+
+def remove_stale_pages(out_dir: str, old_pages: dict, pages: dict) -> int:
+    filenames = {filename for filename, _ in pages.values()}
+    count = 0
+    for name, (filename, _) in old_pages.items():
+        if name not in pages and filename not in filenames:
+            path = os.path.join(out_dir, filename)
+            if os.path.exists(path):
+                os.remove(path)
+                count += 1
+    return count
+
+
+def export_site(
+        graph: GraphInterface,
+        out_dir: str,
+        fmt: str = 'md',
+        workers: Optional[int] = None,
+        incremental: bool = False,
+) -> int:
+    if fmt not in FORMATS:
+        raise ValueError('expected format in {}, got {}'.format(FORMATS, fmt))
+    os.makedirs(out_dir, exist_ok=True)
+    if incremental:
+        old_pages = read_manifest(out_dir, fmt)
+        pages, names = get_changed_pages(graph, out_dir, fmt, old_pages)
+        remove_stale_pages(out_dir, old_pages, pages)
+    else:
+        names = graph.get_node_names_list()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(names) < MIN_PAGES_FOR_POOL:
+        count = write_pages(graph, names, out_dir, fmt)
+    else:
+        count = write_pages_in_pool(graph, names, out_dir, fmt, workers)
+    if incremental:
+        write_manifest(out_dir, fmt, pages)
+    return count
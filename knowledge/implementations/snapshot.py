@@ -0,0 +1,213 @@
+from typing import NoReturn
+import marshal
+import gc
+import struct
+import zlib
+import os
+
+try:  # Assume we're a submodule in a package.
+    from interfaces import GraphInterface, NodeInterface, BlockInterface, LinkInterface
+    import type_enums as te
+    import classes as cs
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...interfaces import GraphInterface, NodeInterface, BlockInterface, LinkInterface
+    from ... import type_enums as te
+    from ... import classes as cs
+
+Name = str
+Code = int
+
+MAGIC = b'SMDG'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHIQ')  # magic, format version, marshal version, crc32, payload size
+COMPRESSION_LEVEL = 1
+MISSING = -1
+
+EDGE_TYPES = tuple(te.EdgeType)
+LINK_TYPES = tuple(te.LinkType)
+BLOCK_TYPES = tuple(te.BlockType)
+EDGE_TYPE_CODES = {t: n for n, t in enumerate(EDGE_TYPES)}
+LINK_TYPE_CODES = {t: n for n, t in enumerate(LINK_TYPES)}
+BLOCK_TYPE_CODES = {t: n for n, t in enumerate(BLOCK_TYPES)}
+
+
+class SnapshotWriter:
+    def __init__(self):
+        self._values = list()
+        self._value_codes = dict()
+
+    def get_code(self, value) -> Code:
+        if value is None:
+            return MISSING
+        code = self._value_codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._value_codes[value] = code
+            self._values.append(value)
+        return code
+
+    def get_link_record(self, link: LinkInterface) -> tuple:
+        a_name, b_name, _ = link.get_edge().get_name_tuple()
+        return (
+            self.get_code(a_name),
+            self.get_code(b_name),
+            EDGE_TYPE_CODES[link.get_edge().get_type()],
+            int(link.is_from_b()),
+            self.get_code(link.get_caption()),
+            int(link.is_external()),
+        )
+
+    def get_block_record(self, block: BlockInterface) -> tuple:
+        items = list()
+        for item in block.get_items():
+            if isinstance(item, cs.Link):
+                items.append(self.get_link_record(item))
+            elif isinstance(item, str):
+                items.append(self.get_code(item))
+            else:
+                items.append([item])
+        return (
+            BLOCK_TYPE_CODES[block.get_block_type()],
+            self.get_code(block.get_title()),
+            self.get_code(block.get_anchor()),
+            tuple(items),
+        )
+
+    def get_node_record(self, name: Name, node: NodeInterface) -> tuple:
+        return (
+            self.get_code(name),
+            tuple(self.get_code(t) for t in node.get_titles()),
+            tuple(self.get_block_record(b) for b in node.get_content_blocks_list()),
+            tuple((LINK_TYPE_CODES[t], self.get_block_record(b)) for t, b in node.get_link_blocks_dict().items()),
+        )
+
+    def get_payload(self, graph: GraphInterface) -> bytes:
+        nodes = tuple(self.get_node_record(n, i) for n, i in graph.get_nodes_dict().items())
+        edges = tuple(
+            (self.get_code(a_name), self.get_code(b_name), EDGE_TYPE_CODES[edge.get_type()])
+            for (a_name, b_name, _), edge in graph.get_edges_dict().items()
+        )
+        data = tuple(self._values), nodes, edges
+        return zlib.compress(marshal.dumps(data), COMPRESSION_LEVEL)
+
+
+class SnapshotReader:
+    def __init__(self, graph: GraphInterface, values: tuple):
+        self._graph = graph
+        self._values = values
+        self._unregistered_nodes = dict()
+        self._edges = dict()
+
+    def get_value(self, code: Code):
+        if code == MISSING:
+            return None
+        return self._values[code]
+
+    def get_node(self, code: Code) -> NodeInterface:
+        name = self._values[code]
+        node = self._graph.get_nodes_dict().get(name)
+        if node is None:
+            node = self._unregistered_nodes.get(name)
+        if node is None:
+            node = cs.Node(name=name, register=False, graph=self._graph)
+            self._unregistered_nodes[name] = node
+        return node
+
+    def get_edge(self, a_code: Code, b_code: Code, edge_type_code: Code):
+        key = a_code, b_code, edge_type_code
+        edge = self._edges.get(key)
+        if edge is None:
+            edge_type = EDGE_TYPES[edge_type_code]
+            edge = cs.Edge(self.get_node(a_code), self.get_node(b_code), edge_type, register=False, graph=self._graph)
+            self._edges[key] = edge
+        return edge
+
+    def get_link(self, record: tuple) -> LinkInterface:
+        a_code, b_code, edge_type_code, is_from_b, caption_code, is_external = record
+        return cs.Link(
+            edge=self.get_edge(a_code, b_code, edge_type_code),
+            is_from_b=bool(is_from_b),
+            caption=self.get_value(caption_code),
+            is_external=bool(is_external),
+        )
+
+    def get_block(self, record: tuple) -> BlockInterface:
+        block_type_code, title_code, anchor_code, item_records = record
+        items = list()
+        for item in item_records:
+            if isinstance(item, int):
+                items.append(self._values[item])
+            elif isinstance(item, tuple):
+                items.append(self.get_link(item))
+            else:
+                items.append(item[0])
+        return cs.Block(
+            title=self.get_value(title_code),
+            block_type=BLOCK_TYPES[block_type_code],
+            items=items,
+            anchor=self.get_value(anchor_code),
+        )
+
+    def load(self, node_records: tuple, edge_records: tuple) -> GraphInterface:
+        graph = self._graph
+        nodes = list()
+        for name_code, title_codes, _, _ in node_records:
+            titles = [self._values[c] for c in title_codes]
+            node = cs.Node(name=self._values[name_code], titles=titles, register=False, graph=graph)
+            graph.add_node(node)
+            nodes.append(node)
+        for a_code, b_code, edge_type_code in edge_records:
+            graph.add_edge(self.get_edge(a_code, b_code, edge_type_code))
+        for node, (_, _, content_block_records, link_block_records) in zip(nodes, node_records):
+            for record in content_block_records:
+                node.add_content_block(self.get_block(record))
+            link_blocks = node.get_link_blocks_dict()
+            for link_type_code, record in link_block_records:
+                block = self.get_block(record)
+                link_blocks[LINK_TYPES[link_type_code]] = block
+                node.add_block_links_to_index(block)
+        return graph
+
+
+def save_snapshot(graph: GraphInterface, path: str) -> NoReturn:
+    payload = SnapshotWriter().get_payload(graph)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, zlib.crc32(payload), len(payload))
+    tmp_path = '{}.tmp'.format(path)
+    with open(tmp_path, 'wb') as file_holder:
+        file_holder.write(header)
+        file_holder.write(payload)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot_data(path: str) -> tuple:
+    with open(path, 'rb') as file_holder:
+        header = file_holder.read(HEADER.size)
+        payload = file_holder.read()
+    if len(header) < HEADER.size:
+        raise ValueError('snapshot {} is truncated'.format(path))
+    magic, format_version, marshal_version, crc, size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError('file {} is not a graph snapshot'.format(path))
+    if format_version != FORMAT_VERSION or marshal_version != marshal.version:
+        template = 'snapshot {} has version {}.{}, expected {}.{}'
+        raise ValueError(template.format(path, format_version, marshal_version, FORMAT_VERSION, marshal.version))
+    if len(payload) != size or zlib.crc32(payload) != crc:
+        raise ValueError('snapshot {} is corrupted'.format(path))
+    try:
+        data = marshal.loads(zlib.decompress(payload))
+    except (ValueError, EOFError, TypeError, zlib.error) as e:
+        raise ValueError('snapshot {} is corrupted: {}'.format(path, e))
+    return data
+
+
+def load_snapshot(graph: GraphInterface, path: str) -> GraphInterface:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # records are nested tuples, so collector passes while unmarshalling them are wasted too
+    try:
+        values, node_records, edge_records = read_snapshot_data(path)
+        with graph.writing():  # readers of thread-safe graph see either old or whole loaded graph
+            graph.clear()  # graph is kept as is if snapshot can not be read
+            return SnapshotReader(graph, values).load(node_records, edge_records)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
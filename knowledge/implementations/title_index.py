@@ -0,0 +1,247 @@
+from typing import Optional
+from bisect import bisect_left
+import re
+
+try:  # Assume we're a submodule in a package.
+    from utils import transliterate
+    from interfaces import GraphInterface, NodeInterface
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...utils import transliterate
+    from ...interfaces import GraphInterface, NodeInterface
+
+Name = str
+Key = str
+
+DEFAULT_LIMIT = 10
+MAX_DISTANCE = 2
+MIN_LENGTH_PER_EDIT = 5  # one edit is allowed per 5 chars of key, so short keys are matched exactly
+MAX_RESOLVE_CANDIDATES = 1000  # query with more trigram hits is too common to be resolved to a single node
+GRAM_SIZE = 3
+GRAM_PADDING = '\x00' * (GRAM_SIZE - 1)
+NON_DIGITS = re.compile(r'\D+')
+
+
+def get_key(text: str) -> Key:
+    return ' '.join(transliterate(text.lower()).split())
+
+
+def get_grams(key: Key) -> set:
+    padded = GRAM_PADDING + key + GRAM_PADDING
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+def get_default_max_distance(key: Key) -> int:
+    return min(MAX_DISTANCE, len(key) // MIN_LENGTH_PER_EDIT)
+
+
+def get_digits(key: Key) -> str:
+    return NON_DIGITS.sub('', key)
+
+
+def get_edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return None
+        previous = current
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
+
+
+class TitleIndex:
+    # sorted keys answer prefix queries by bisect, trigram postings give candidates for approximate ones
+    def __init__(self, graph: GraphInterface):
+        self._graph = graph
+        self._key_ids = dict()
+        self._keys = list()
+        self._names = list()  # key id -> {name: None}
+        self._sorted_keys = list()
+        self._pending_keys = list()
+        self._grams = dict()  # gram -> key ids, filled lazily as only approximate queries need it
+        self._gram_key_count = 0
+        self._is_built = False
+        graph.add_listener(self)
+
+    def get_graph(self) -> GraphInterface:
+        return self._graph
+
+    def get_key_count(self) -> int:
+        return len(self.refresh()._keys)
+
+    def clear(self):
+        self._key_ids = dict()
+        self._keys = list()
+        self._names = list()
+        self._sorted_keys = list()
+        self._pending_keys = list()
+        self._grams = dict()
+        self._gram_key_count = 0
+        return self
+
+    def build(self):
+        self.clear()
+        for node in self.get_graph().get_nodes_iter():
+            self.add_node(node)
+        self._is_built = True
+        return self.refresh()
+
+    def refresh(self):
+        if not self._is_built:
+            return self.build()
+        if self._pending_keys:
+            self._sorted_keys += self._pending_keys
+            self._sorted_keys.sort()
+            self._pending_keys = list()
+        return self
+
+    def refresh_grams(self):
+        keys, grams = self._keys, self._grams
+        for key_id in range(self._gram_key_count, len(keys)):
+            for gram in get_grams(keys[key_id]):
+                ids = grams.get(gram)
+                if ids is None:
+                    grams[gram] = [key_id]
+                else:
+                    ids.append(key_id)
+        self._gram_key_count = len(keys)
+        return self
+
+    def add_text(self, text: str, name: Name):
+        if not isinstance(text, str):
+            return self
+        key = get_key(text)
+        if not key:
+            return self
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            self._key_ids[key] = len(self._keys)
+            self._keys.append(key)
+            self._names.append({name: None})
+            self._pending_keys.append(key)
+        else:
+            self._names[key_id][name] = None
+        return self
+
+    def add_node(self, node: NodeInterface, name: Optional[Name] = None):
+        if name is None:
+            name = node.get_name()
+        self.add_text(name, name)
+        for title in node.get_titles():
+            self.add_text(title, name)
+        return self
+
+    def on_add_node(self, node: NodeInterface):
+        if self._is_built:
+            self.add_node(node)
+
+    def on_update_node(self, node: NodeInterface):
+        if self._is_built:
+            self.add_node(node)
+
+    def on_rename_node(self, old_name: Name, new_name: Name):
+        if self._is_built:  # old name is skipped by get_node_names() as it is not in graph anymore
+            node = self.get_graph().get_node_by_name(new_name)
+            if node is not None:  # node keeps its old name until rename is finished
+                self.add_node(node, name=new_name)
+
+    def on_clear(self):
+        self.clear()
+
+    def get_node_names(self, keys) -> list:
+        nodes = self.get_graph().get_nodes_dict()
+        names = dict()
+        for key in keys:
+            for name in self._names[self._key_ids[key]]:
+                if name in nodes:
+                    names[name] = None
+        return list(names)
+
+    def find_prefix_keys(self, prefix: str, limit: Optional[int] = DEFAULT_LIMIT) -> list:
+        self.refresh()
+        prefix = get_key(prefix)
+        keys = self._sorted_keys
+        found = list()
+        for n in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[n]
+            if not key.startswith(prefix) or (limit is not None and len(found) >= limit):
+                break
+            found.append(key)
+        return found
+
+    def get_approx_matches(
+            self,
+            key: Key,
+            max_distance: int,
+            max_candidates: Optional[int] = None,
+            same_digits: bool = False,
+    ) -> list:
+        if not self._is_built:
+            self.build()
+        self.refresh_grams()  # sorted keys are not needed here, so pending keys are not merged
+        grams = get_grams(key)
+        postings = sorted((self._grams.get(g, ()) for g in grams), key=len)
+        # one edit breaks at most GRAM_SIZE grams, so close key shares the rest of them and one of the rarest
+        required_count = len(grams) - GRAM_SIZE * max_distance
+        if required_count > 0:
+            postings = postings[:len(grams) - required_count + 1]
+        if max_candidates is not None and sum(map(len, postings)) > max_candidates:
+            return list()
+        candidate_ids = set()
+        for key_ids in postings:
+            candidate_ids.update(key_ids)
+        keys = self._keys
+        length = len(key)
+        digits = get_digits(key) if same_digits else None
+        matches = list()
+        for key_id in candidate_ids:
+            candidate = keys[key_id]
+            if abs(len(candidate) - length) > max_distance:
+                continue
+            if digits is not None and get_digits(candidate) != digits:
+                continue
+            if required_count > 1 and len(grams.intersection(get_grams(candidate))) < required_count:
+                continue
+            distance = get_edit_distance(key, candidate, max_distance)
+            if distance is not None:
+                matches.append((distance, abs(len(candidate) - length), candidate))
+        matches.sort()
+        return matches
+
+    def find_approx_keys(self, text: str, limit: Optional[int] = DEFAULT_LIMIT, max_distance: Optional[int] = None) -> list:
+        key = get_key(text)
+        if max_distance is None:
+            max_distance = get_default_max_distance(key)
+        matches = self.get_approx_matches(key, max_distance)
+        return [candidate for _, _, candidate in matches[:limit]]
+
+    def find_node_names(
+            self,
+            prefix: Optional[str] = None,
+            approx: Optional[str] = None,
+            limit: Optional[int] = DEFAULT_LIMIT,
+    ) -> list:
+        if (prefix is None) == (approx is None):
+            raise ValueError('expected one of prefix or approx, got prefix={}, approx={}'.format(prefix, approx))
+        if prefix is not None:
+            keys = self.find_prefix_keys(prefix, limit=limit)
+        else:
+            keys = self.find_approx_keys(approx, limit=limit)
+        names = self.get_node_names(keys)
+        return names if limit is None else names[:limit]
+
+    def get_closest_name(self, text: str, max_distance: Optional[int] = None) -> Optional[Name]:
+        key = get_key(text)
+        if max_distance is None:
+            max_distance = get_default_max_distance(key)
+        # numbered titles as 'part 1' and 'part 2' are different things, so digits have to match exactly
+        matches = self.get_approx_matches(key, max_distance, max_candidates=MAX_RESOLVE_CANDIDATES, same_digits=True)
+        if not matches or (len(matches) > 1 and matches[1][0] == matches[0][0]):
+            return None  # nothing is close enough or best match is not unique
+        names = self.get_node_names([matches[0][2]])
+        if len(names) == 1:  # ambiguous title is not resolved
+            return names[0]
@@ -0,0 +1,130 @@
+from typing import Optional, Generator, Iterable, Union
+
+try:  # Assume we're a submodule in a package.
+    from interfaces import GraphInterface, NodeInterface
+    import type_enums as te
+    import classes as cs
+except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ...interfaces import GraphInterface, NodeInterface
+    from ... import type_enums as te
+    from ... import classes as cs
+
+Name = str
+Depth = int
+LinkTypes = Union[te.LinkType, str, Iterable, None]
+
+ORDERS = 'bfs', 'dfs'
+DESCENDANT_LINK_TYPE = te.LinkType.Child
+ANCESTOR_LINK_TYPE = te.LinkType.Parent
+
+
+def get_link_types(link_types: LinkTypes = None) -> tuple:
+    if link_types is None:
+        return tuple(te.LinkType)
+    elif isinstance(link_types, (te.LinkType, str)):
+        return te.LinkType.get_type(link_types),
+    else:
+        return tuple(te.LinkType.get_type(t) for t in link_types)
+
+
+def get_steps(link_types: LinkTypes = None) -> tuple:
+    # node is on side a of the edge for the first link type of edge type, on side b for the second one
+    return tuple((t.get_edge_type(), t.get_direction()) for t in get_link_types(link_types))
+
+
+def get_start_name(start: Union[NodeInterface, Name]) -> Name:
+    return start if isinstance(start, Name) else cs.get_name(start)
+
+
+def get_neighbor_names_iter(adjacency: dict, name: Name, steps: tuple) -> Generator:
+    node_adjacency = adjacency.get(name)
+    if not node_adjacency:
+        return
+    for edge_type, is_from_b in steps:
+        name_tuples = node_adjacency.get(edge_type)
+        if not name_tuples:
+            continue
+        if is_from_b:
+            for a_name, b_name, _ in name_tuples:
+                if b_name == name:
+                    yield a_name
+        else:
+            for a_name, b_name, _ in name_tuples:
+                if a_name == name:
+                    yield b_name
+
+
+def get_bfs_iter(
+        graph: GraphInterface,
+        start: Union[NodeInterface, Name],
+        link_types: LinkTypes = None,
+        max_depth: Optional[Depth] = None,
+        include_start: bool = False,
+) -> Generator:
+    adjacency = graph.get_adjacency_dict()
+    steps = get_steps(link_types)
+    start_name = get_start_name(start)
+    visited = {start_name}
+    if include_start:
+        yield start_name, 0
+    level = [start_name]
+    depth = 0
+    while level and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_level = list()
+        for name in level:
+            for neighbor in get_neighbor_names_iter(adjacency, name, steps):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    next_level.append(neighbor)
+        for neighbor in next_level:
+            yield neighbor, depth
+        level = next_level
+
+
+def get_dfs_iter(
+        graph: GraphInterface,
+        start: Union[NodeInterface, Name],
+        link_types: LinkTypes = None,
+        max_depth: Optional[Depth] = None,
+        include_start: bool = False,
+) -> Generator:
+    adjacency = graph.get_adjacency_dict()
+    steps = get_steps(link_types)
+    start_name = get_start_name(start)
+    visited = set()
+    stack = [(start_name, 0)]
+    while stack:
+        name, depth = stack.pop()
+        if name in visited:
+            continue
+        visited.add(name)
+        if depth or include_start:
+            yield name, depth
+        if max_depth is None or depth < max_depth:
+            neighbors = [n for n in get_neighbor_names_iter(adjacency, name, steps) if n not in visited]
+            stack.extend((n, depth + 1) for n in reversed(neighbors))  # first neighbor is visited first
+
+
+def get_traversal_iter(
+        graph: GraphInterface,
+        start: Union[NodeInterface, Name],
+        link_types: LinkTypes = None,
+        order: str = 'bfs',
+        max_depth: Optional[Depth] = None,
+        include_start: bool = False,
+) -> Generator:
+    if order == 'bfs':
+        return get_bfs_iter(graph, start, link_types, max_depth=max_depth, include_start=include_start)
+    elif order == 'dfs':
+        return get_dfs_iter(graph, start, link_types, max_depth=max_depth, include_start=include_start)
+    else:
+        raise ValueError('expected order in {}, got {}'.format(ORDERS, order))
+
+
+def get_descendant_names(graph: GraphInterface, node: Union[NodeInterface, Name], max_depth: Optional[Depth] = None) -> list:
+    return [name for name, _ in get_bfs_iter(graph, node, DESCENDANT_LINK_TYPE, max_depth=max_depth)]
+
+
+def get_ancestor_names(graph: GraphInterface, node: Union[NodeInterface, Name], max_depth: Optional[Depth] = None) -> list:
+    return [name for name, _ in get_bfs_iter(graph, node, ANCESTOR_LINK_TYPE, max_depth=max_depth)]
@@ -8,6 +8,8 @@ Name = str
 
 
 class EdgeInterface(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def get_a(self) -> NodeInterface:
         pass
@@ -24,9 +26,8 @@ class EdgeInterface(ABC):
     def get_node_pairs(self) -> tuple:
         pass
 
-    @staticmethod
     @abstractmethod
-    def get_graph() -> GraphInterface:
+    def get_graph(self) -> GraphInterface:
         pass
 
     @abstractmethod
@@ -45,6 +45,10 @@ class GraphInterface(ABC):
     def get_node_by_title(self, title: Title, default=None) -> Optional[NodeInterface]:
         pass
 
+    @abstractmethod
+    def add_node_title(self, node: NodeInterface, title: Title) -> Native:
+        pass
+
     @abstractmethod
     def add_node(self, node: NodeInterface) -> Native:
         pass
@@ -66,17 +70,135 @@ class GraphInterface(ABC):
         pass
 
     @abstractmethod
-    def get_edges_for_node(self, item):
+    def get_edges_for_node(self, item, edge_type=None):
         pass
 
     @abstractmethod
-    def get_outgoing_edges(self, node) -> Iterable:
+    def get_outgoing_edges(self, node, edge_type=None) -> Iterable:
         pass
 
     @abstractmethod
-    def get_incoming_edges(self, node) -> Iterable:
+    def get_incoming_edges(self, node, edge_type=None) -> Iterable:
         pass
 
     @abstractmethod
     def drop_edge(self, edge) -> Native:
         pass
+
+    @abstractmethod
+    def get_adjacency_dict(self) -> dict:
+        pass
+
+    @abstractmethod
+    def get_traversal_iter(self, start, link_types=None, order='bfs', max_depth=None, include_start=False):
+        pass
+
+    @abstractmethod
+    def get_descendant_names(self, node, max_depth: Optional[int] = None) -> list:
+        pass
+
+    @abstractmethod
+    def get_ancestor_names(self, node, max_depth: Optional[int] = None) -> list:
+        pass
+
+    @abstractmethod
+    def add_listener(self, listener) -> Native:
+        pass
+
+    @abstractmethod
+    def drop_listener(self, listener) -> Native:
+        pass
+
+    @abstractmethod
+    def get_edge_version(self, edge_type) -> int:
+        pass
+
+    @abstractmethod
+    def get_learning_path(self, target) -> list:
+        pass
+
+    @abstractmethod
+    def is_descendant(self, node, ancestor) -> bool:
+        pass
+
+    @abstractmethod
+    def notify(self, event: str, *args) -> Native:
+        pass
+
+    @abstractmethod
+    def search(self, query: str, limit: Optional[int] = None) -> list:
+        pass
+
+    @abstractmethod
+    def find_nodes(self, prefix: Optional[str] = None, approx: Optional[str] = None, limit: Optional[int] = None) -> list:
+        pass
+
+    @abstractmethod
+    def get_closest_node(self, text: str, max_distance: Optional[int] = None) -> Optional[NodeInterface]:
+        pass
+
+    @abstractmethod
+    def is_resolving_closest(self) -> bool:
+        pass
+
+    @abstractmethod
+    def is_thread_safe(self) -> bool:
+        pass
+
+    @abstractmethod
+    def writing(self):
+        pass
+
+    @abstractmethod
+    def get_view(self):
+        pass
+
+    @abstractmethod
+    def update_node(self, node: NodeInterface) -> Native:
+        pass
+
+    @abstractmethod
+    def touch_node(self, name: Name) -> Native:
+        pass
+
+    @abstractmethod
+    def is_batch_mode(self) -> bool:
+        pass
+
+    @abstractmethod
+    def batch(self):
+        pass
+
+    @abstractmethod
+    def bulk_load(self, objects: Iterable) -> Native:
+        pass
+
+    @abstractmethod
+    def is_sharing_edges(self) -> bool:
+        pass
+
+    @abstractmethod
+    def get_memory_report(self) -> dict:
+        pass
+
+    @abstractmethod
+    def save_snapshot(self, path: str) -> Native:
+        pass
+
+    @abstractmethod
+    def load_snapshot(self, path: str) -> Native:
+        pass
+
+    @abstractmethod
+    def get_page_records(self):
+        pass
+
+    @abstractmethod
+    def export_site(
+            self,
+            out_dir: str,
+            fmt: str = 'md',
+            workers: Optional[int] = None,
+            incremental: bool = False,
+    ) -> int:
+        pass
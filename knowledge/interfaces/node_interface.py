@@ -19,9 +19,10 @@ Caption = str
 
 
 class NodeInterface(ABC):
-    @staticmethod
+    __slots__ = ()
+
     @abstractmethod
-    def get_graph() -> GraphInterface:
+    def get_graph(self) -> GraphInterface:
         pass
 
     @abstractmethod
@@ -32,6 +33,14 @@ class NodeInterface(ABC):
     def is_registered(self) -> bool:
         pass
 
+    @abstractmethod
+    def copy(self) -> Native:
+        pass
+
+    @abstractmethod
+    def rename_link_target(self, old_name: Name, new_name: Name) -> Native:
+        pass
+
     @abstractmethod
     def get_hash(self):
         pass
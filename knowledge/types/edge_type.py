@@ -12,19 +12,10 @@ class EdgeType(Enum):
     AlsoRelation = 'also_relation'
     ReferenceMention = 'reference_mention'
 
+    __hash__ = object.__hash__
+
     def get_link_types(self):
-        if self == EdgeType.ParentChild:
-            return te.LinkType.Parent, te.LinkType.Child
-        elif self == EdgeType.PrereqMore:
-            return te.LinkType.Prereq, te.LinkType.More
-        elif self == EdgeType.UsesUsage:
-            return te.LinkType.Uses, te.LinkType.Usage
-        elif self == EdgeType.SourceReceptor:
-            return te.LinkType.Source, te.LinkType.Receptor
-        elif self == EdgeType.AlsoRelation:
-            return te.LinkType.Also, te.LinkType.Relation
-        elif self == EdgeType.ReferenceMention:
-            return te.LinkType.Reference, te.LinkType.Mention
+        return te.LinkType.get_link_types_by_edge_type(self)
 
     @staticmethod
     def get_type(edge_type, skip_missing: bool = False):
@@ -1,7 +1,19 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+
 try:  # Assume we're a submodule in a package.
     from . import hierdoc as ct
+    from . import yamldoc as yd
+    from . import corpus as cp
+    from . import classes as cs
 except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
     import hierdoc as ct
+    import yamldoc as yd
+    import corpus as cp
+    import classes as cs
 
 
 def test_paragraph():
@@ -32,5 +44,86 @@ def test_tree():
             print(line)
 
 
+def test_deep_tree():
+    depth = 3000
+    lines = ['title'] + [ct.SPACE * ct.INDENT_STEP * level + '- line {}'.format(level) for level in range(1, depth + 1)]
+    lines += ['    x commented', '    - last']
+    tree = ct.Tree('\n'.join(lines))
+    assert tree.get_subtrees_count() == 2
+    assert tree.get_depth() == depth
+    assert tree.get_lines_count() == depth + 2
+    assert list(tree.get_hiertext()) == lines[:-2] + lines[-1:]
+
+
+def test_parsed_yaml_cache():
+    with tempfile.TemporaryDirectory() as source_dir, tempfile.TemporaryDirectory() as cache_dir:
+        filenames = [os.path.join(source_dir, '{}.yaml'.format(n)) for n in 'abc']
+        past = time.time() - 60
+        for filename in filenames:
+            with open(filename, 'w') as file_holder:
+                file_holder.write('- id: x\n  title: X\n')
+            os.utime(filename, (past, past))
+        expected = [dict(id='x', title='X')]
+        assert yd.get_parsed_yaml(filenames[0], cache_dir=cache_dir) == expected
+        assert not os.listdir(cache_dir)  # cache is opt-in
+        assert yd.get_parsed_yaml(filenames[0], use_cache=True, cache_dir=cache_dir) == expected
+        assert yd.get_parsed_yaml(filenames[0], use_cache=True, cache_dir=cache_dir) == expected
+        assert len(os.listdir(cache_dir)) == 1
+        with open(filenames[0], 'w') as file_holder:
+            file_holder.write('- id: y\n')
+        assert yd.get_parsed_yaml(filenames[0], use_cache=True, cache_dir=cache_dir) == [dict(id='y')]
+        cache_paths = [os.path.join(cache_dir, n) for n in os.listdir(cache_dir)]
+        assert yd.CACHE_SIZES[cache_dir] == sum(map(os.path.getsize, cache_paths))  # kept without scanning directory
+        with open(yd.get_cache_path(os.path.abspath(filenames[1]), cache_dir), 'wb') as file_holder:
+            file_holder.write(b'corrupted')
+        assert yd.get_parsed_yaml(filenames[1], use_cache=True, cache_dir=cache_dir, max_cache_size=1) == expected
+        assert len(os.listdir(cache_dir)) <= 1
+        with open(filenames[2], 'w') as file_holder:
+            file_holder.write('- id: d\n  date: 2020-01-02\n')
+        parsed = yd.get_parsed_yaml(filenames[2], use_cache=True, cache_dir=cache_dir)
+        assert str(parsed[0]['date']) == '2020-01-02'  # not cached by marshal, but parsed anyway
+
+
+def test_yaml_stream():
+    text = '- id: a\n  title: Alpha\n- &b {id: b, title: Beta}\n- *b\n---\n---\nid: c\n'
+    records = list(ct.get_safe_loaded_yaml_iter(text))
+    assert records == [dict(id='a', title='Alpha'), dict(id='b', title='Beta'), dict(id='b', title='Beta'), dict(id='c')]
+    with cs.graph_context() as graph:
+        ct.Tree('yaml', subtrees=list()).add_yaml_text(io.StringIO(text))
+    assert graph.get_node_names_list() == ['a', 'b', 'c']
+    assert graph.get_node_by_name('b').get_titles() == ['Beta']
+
+
+def test_load_corpus():
+    with tempfile.TemporaryDirectory() as source_dir:
+        for n in range(cp.MIN_FILES_FOR_POOL + 4):
+            with open(os.path.join(source_dir, 'part{:02}.yaml'.format(n)), 'w') as file_holder:
+                file_holder.write('- id: node{0}\n  title: Node {0}\n  info: from part {0}\n'.format(n))
+                file_holder.write('- id: common\n  title: Common {0}\n  parent: node{0}\n'.format(n))
+        with open(os.path.join(source_dir, 'notes.txt'), 'w') as file_holder:
+            file_holder.write('- (notes) Notes = Hiertext notes\n    - first line\n    x commented\n')
+            file_holder.write('    - [parent] (common) Common\n    = (later) Later = Defined below\n')
+        assert cp.read_corpus_file(os.path.join(source_dir, 'notes.txt'))[1][0]['parent'] == [
+            dict(id='common', caption='Common'),
+        ]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            graphs = [cp.load_corpus(source_dir, workers=workers, graph=cs.Graph()) for workers in (1, 2)]
+        assert output.getvalue() == ''
+        for graph in graphs:
+            assert graph.get_node_count() == cp.MIN_FILES_FOR_POOL + 7
+            assert graph.get_node_by_name('common').get_titles()[:2] == ['Common 0', 'Common 1']
+            assert graph.get_node_by_name('notes').get_main_title() == 'Notes'
+            assert graph.get_node_by_name('notes').get_link('later', cs.LinkType.Child)
+            assert not any(source_dir in name for name in graph.get_node_names_list())
+        pages = [[list(node.get_page().get_markdown()) for node in g.get_nodes_list()] for g in graphs]
+        assert pages[0] == pages[1]
+        assert cp.get_corpus_paths(os.path.join(source_dir, '*.txt')) == [os.path.join(source_dir, 'notes.txt')]
+
+
 def tests():
     test_tree()
+    test_deep_tree()
+    test_parsed_yaml_cache()
+    test_yaml_stream()
+    test_load_corpus()
@@ -1,13 +1,23 @@
+import io
+import os
+import tempfile
+import threading
+import time
+
 try:  # Assume we're a submodule in a package.
+    from utils import get_page_filename
     import classes as cs
+    from content.implementations import page as pg
 except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from ..utils import get_page_filename
     from .. import classes as cs
+    from ..content.implementations import page as pg
 
 
 def test_create_item():
     cs.Node('a')
-    assert 'a' in cs.get_graph().items
-    assert 'b' not in cs.get_graph().items
+    assert 'a' in cs.get_graph().get_nodes_dict()
+    assert 'b' not in cs.get_graph().get_nodes_dict()
     cs.get_graph().clear()
 
 
@@ -20,6 +30,577 @@ def test_create_edge():
     assert not cs.get_graph().get_edge('b', 'c', cs.EdgeType.UsesUsage)
 
 
+def test_get_node_by_title():
+    cs.get_graph().clear()
+    a = cs.Node('a', titles=['Alpha'])
+    b = cs.Node('b')
+    b.add_title('Beta')
+    assert cs.get_graph().get_node_by_title('Alpha') is a
+    assert cs.get_graph().get_node_by_title('Beta') is b
+    assert cs.get_graph().get_node('Beta') is b
+    assert cs.get_graph().get_node_by_title('Gamma') is None
+    cs.Node('a', titles=['Alpha', 'Gamma'])
+    assert cs.get_graph().get_node_by_title('Gamma') is a
+    b.set_name('c', allow_rename=True)
+    assert cs.get_graph().get_node_by_name('Beta') is b
+    assert cs.get_graph().get_node('c') is b
+    d = cs.Node('d', titles=['Alpha', 'Delta'])  # shared title stays owned by first node
+    assert cs.get_graph().get_node_by_title('Alpha') is a
+    cs.get_graph().add_node(cs.Node('a', titles=['Gamma'], register=False))  # node a is replaced
+    assert cs.get_graph().get_node_by_title('Alpha') is d
+    assert cs.get_graph().get_node_by_title('Gamma').get_name() == 'a'
+
+
+def test_get_edges_for_node():
+    cs.get_graph().clear()
+    a, b, c = cs.Node('a'), cs.Node('b'), cs.Node('c')
+    ab = cs.Edge(a, b, cs.EdgeType.ParentChild)
+    cs.Edge(a, c, cs.EdgeType.UsesUsage)
+    graph = cs.get_graph()
+    assert len(list(graph.get_edges_for_node('a'))) == 2
+    assert list(graph.get_edges_for_node(b)) == [ab]
+    assert list(graph.get_edges_for_node('a', edge_type=cs.EdgeType.ParentChild)) == [ab]
+    assert not list(graph.get_edges_for_node('c', edge_type='parent_child'))
+    c.set_name('d', allow_rename=True)
+    assert graph.get_edge('a', 'd', cs.EdgeType.UsesUsage)
+    assert not graph.get_edge('a', 'c', cs.EdgeType.UsesUsage)
+    assert len(list(graph.get_edges_for_node('d'))) == 1
+    ab.drop()
+    assert not list(graph.get_edges_for_node('b'))
+    assert len(list(graph.get_edges_for_node('a'))) == 1
+
+
+def test_get_link():
+    cs.get_graph().clear()
+    a = cs.Node('a')
+    b = cs.Node('b')
+    a.add_link_by_type_and_target(cs.LinkType.Child, 'b', caption='B')
+    link = a.get_link(b, cs.LinkType.Child)
+    assert link.get_target_node() is b
+    assert link.get_caption() == 'B'
+    assert not a.get_link(b, cs.LinkType.Parent)
+    assert a.has_outgoing_link_to_node('b')
+    assert not b.has_outgoing_link_to_node(a)
+    edge = link.get_edge()
+    assert edge.is_defined_in_item(a)
+    assert not edge.is_defined_in_item(b)
+    assert list(b.get_incoming_links()) == [link]
+    duplicate = cs.Node('a', register=False)
+    duplicate.add_link_by_type_and_target(cs.LinkType.Uses, 'b')
+    duplicate.register()
+    assert a.get_link('b', cs.LinkType.Uses)
+    b.set_name('c', allow_rename=True)
+    assert a.has_outgoing_link_to_node(b)
+    assert a.get_link(b, cs.LinkType.Child) is link
+    assert link.get_key()[1] == 'c'
+    assert len(list(cs.get_graph().get_outgoing_edges(a))) == 2
+    assert [i.get_caption() for i in b.get_incoming_links()] == ['B', None]
+
+
+def get_graph_texts() -> dict:
+    return {name: list(node.get_text()) for name, node in cs.get_graph().get_nodes_dict().items()}
+
+
+def test_snapshot():
+    cs.get_graph().clear()
+    cs.Node.build_node_from_dict(dict(id='a', title='Alpha', info='text of a', child=['b', 'c'], uses='d'))
+    cs.Node.build_node_from_dict(dict(id='b', title=['Beta', 'B'], parent='a'))
+    texts = get_graph_texts()
+    edges = list(cs.get_graph().get_edges_dict())
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'graph.snapshot')
+        cs.get_graph().save_snapshot(path)
+        cs.get_graph().clear()
+        cs.get_graph().load_snapshot(path)
+        assert get_graph_texts() == texts
+        assert list(cs.get_graph().get_edges_dict()) == edges
+        assert cs.get_graph().get_node('Beta').get_name() == 'b'
+        assert cs.get_graph().get_node('a').get_link('c', cs.LinkType.Child)
+        with open(path, 'r+b') as file_holder:
+            file_holder.seek(-1, os.SEEK_END)
+            file_holder.write(b'?')
+        try:
+            cs.get_graph().load_snapshot(path)
+            raise AssertionError('corrupted snapshot loaded')
+        except ValueError:
+            pass
+        assert get_graph_texts() == texts  # failed load keeps existing graph
+        with open(path, 'wb') as file_holder:
+            file_holder.write(b'SMDG' + b'garbage' * 8)
+        try:
+            cs.get_graph().load_snapshot(path)
+            raise AssertionError('corrupted snapshot loaded')
+        except ValueError:
+            pass
+        assert get_graph_texts() == texts
+
+
+def test_graph_context():
+    cs.get_graph().clear()
+    default_graph = cs.get_graph()
+    with cs.graph_context() as graph:
+        assert cs.get_graph() is graph
+        a = cs.Node('a')
+        a.add_link_by_type_and_target(cs.LinkType.Child, 'b')
+    assert cs.get_graph() is default_graph
+    assert not default_graph.has_name('a')
+    assert graph.has_name('a') and graph.has_name('b')
+    assert graph.get_edge('b', 'a', cs.EdgeType.ParentChild)
+    assert a.get_graph() is graph
+    a.add_link_by_type_and_target(cs.LinkType.Child, 'c')
+    assert graph.has_name('c')
+    assert not default_graph.has_name('c')
+    assert default_graph.get_edge_count() == 0
+
+
+def test_bulk_load():
+    records = [
+        dict(id='a', title='Alpha', child=['b', 'c']),
+        dict(id='b', title='Beta', parent='Alpha'),
+        dict(id='a', info='more about a', uses='Beta'),
+    ]
+    with cs.graph_context() as graph:
+        for record in records:
+            cs.Node.build_node_from_dict(record.copy())
+        expected_texts = {name: list(node.get_text()) for name, node in graph.get_nodes_dict().items()}
+        expected_edges = list(graph.get_edges_dict())
+    graph = cs.Graph()
+    with graph.batch():
+        graph.bulk_load(record.copy() for record in records[:1])
+        for record in records[1:]:
+            cs.Node.build_node_from_dict(record.copy(), graph=graph)
+        assert graph.is_batch_mode()
+        assert not graph.get_nodes_dict()
+    assert not graph.is_batch_mode()
+    assert {name: list(node.get_text()) for name, node in graph.get_nodes_dict().items()} == expected_texts
+    graph = cs.Graph().bulk_load(records)
+    assert {name: list(node.get_text()) for name, node in graph.get_nodes_dict().items()} == expected_texts
+    assert list(graph.get_edges_dict()) == expected_edges
+    a = graph.get_node('a')
+    assert a.get_titles() == ['Alpha']
+    assert a.get_link('b', cs.LinkType.Uses).get_target_node() is graph.get_node('b')
+    for edge in graph.get_edges_dict().values():
+        assert all(graph.get_node(node.get_name()) is node for node in edge.get_nodes())
+
+
+def test_type_synonyms():
+    assert cs.LinkType.get_type('cats') == cs.LinkType.Parent
+    assert cs.LinkType.has_type('see_also')
+    assert not cs.LinkType.has_type('title')
+    assert cs.BlockType.get_type('header') == cs.BlockType.Title
+    for edge_type in cs.EdgeType:
+        link_a, link_b = edge_type.get_link_types()
+        assert link_a.get_edge_type() == edge_type == link_b.get_edge_type()
+        assert not link_a.get_direction() and link_b.get_direction()
+    try:
+        cs.LinkType.get_type('unknown')
+        raise AssertionError('unknown link type resolved')
+    except ValueError:
+        pass
+
+
+def test_merge_block():
+    with cs.graph_context():
+        a, b, c = cs.Node('a'), cs.Node('b'), cs.Node('c')
+        ab = cs.Link.build_link_from_nodes(a, b, cs.LinkType.Child)
+        ac = cs.Link.build_link_from_nodes(a, c, cs.LinkType.Child)
+        assert ab == ab.copy() and hash(ab) == hash(ab.copy())
+        assert ab != ac
+        block = cs.Block(block_type=cs.BlockType.Links, items=[ab])
+        block.merge_block(cs.Block(block_type=cs.BlockType.Links, items=[ab.copy(), ac, ac]))
+        assert block.get_items() == [ab, ac]
+        props = cs.Block(block_type=cs.BlockType.Props, items=[dict(k='v')])
+        props.merge_block(cs.Block(block_type=cs.BlockType.Props, items=[dict(k='v'), 'text']))
+        assert props.get_items() == [dict(k='v'), 'text']
+
+
+def test_memory_report():
+    objects = [
+        dict(id='a', title='A', child=['b', 'c']),
+        dict(id='b', title='B', parent='a'),
+    ]
+    for share_edges in (False, True):
+        graph = cs.Graph(share_edges=share_edges)
+        graph.bulk_load(objects)
+        a, b = graph.get_node('a'), graph.get_node('b')
+        assert not hasattr(a, '__dict__') and not hasattr(a.get_link(b, cs.LinkType.Child), '__dict__')
+        is_shared = a.get_link(b, cs.LinkType.Child).get_edge() is b.get_link(a, cs.LinkType.Parent).get_edge()
+        assert is_shared == share_edges
+        report = graph.get_memory_report()
+        assert (report['node_count'], report['edge_count'], report['link_count']) == (3, 2, 3)
+        assert report['bytes_per_node'] > 0 and report['bytes_per_link'] > 0
+    block = cs.Block(block_type=cs.BlockType.Info, items=['i{}'.format(i) for i in range(20)])
+    block.merge_block(cs.Block(block_type=cs.BlockType.Info, items=['i5', 'i20']))
+    assert block.get_content_count() == 21
+
+
+def test_columnar_edge_store():
+    objects = [
+        dict(id='a', title='A', child=['b', 'c']),
+        dict(id='b', title='B', parent='a', prereq='c'),
+    ]
+    expected = cs.Graph().bulk_load(objects)
+    graph = cs.Graph(edges=cs.ColumnarEdgeStore()).bulk_load(objects)
+    assert set(graph.get_edges_dict()) == set(expected.get_edges_dict())
+    edge = graph.get_edge('b', 'a', cs.EdgeType.ParentChild)
+    assert edge.get_a() is graph.get_node('b') and edge.get_b() is graph.get_node('a')
+    assert [e.get_name_tuple() for e in graph.get_outgoing_edges('b')] == \
+        [e.get_name_tuple() for e in expected.get_outgoing_edges('b')]
+    graph.drop_edge(edge)
+    assert graph.get_edge('b', 'a', cs.EdgeType.ParentChild) is None
+    assert graph.get_edge_count() == expected.get_edge_count() - 1
+    graph.rename_item('c', 'd')
+    assert graph.get_edge('c', 'a', cs.EdgeType.ParentChild) is None
+    assert graph.get_edge('d', 'a', cs.EdgeType.ParentChild).get_a() is graph.get_node('d')
+    graph.clear()
+    assert graph.get_edge_count() == 0
+
+
+def test_page_markdown():
+    graph = cs.Graph().bulk_load([
+        dict(id='a', title='Topic A', info='About A', child=['b']),
+        dict(id='b', title='Topic [B]', prereq=dict(id='c', title='C', caption='see C')),
+    ])
+    sink = io.StringIO()
+    graph.get_node('b').get_page().write_markdown(sink)
+    expected = [
+        '- [Topic A](a.md)', '',
+        '# Topic [B]', '',
+        '## Prereq', '', '- [see C](c.md)', '',
+    ]
+    assert sink.getvalue() == '\n'.join(expected) + '\n'
+    lines = list(graph.get_node('a').get_page().get_markdown())
+    assert lines[:4] == ['# Topic A', '', 'About A', '']
+    assert '- [Topic \\[B\\]](b.md)' in lines
+
+
+def test_page_filename():
+    graph = cs.Graph().bulk_load([
+        dict(id='a b', title='Space', child=['a/b', 'a?b']),
+        dict(id='a/b', title='Slash'),
+        dict(id='ab', title='Plain'),
+    ])
+    assert get_page_filename('ab') == 'ab.md'
+    assert len({get_page_filename(n) for n in ('a b', 'a/b', 'a?b', 'a_b')}) == 4
+    with tempfile.TemporaryDirectory() as out_dir:
+        assert graph.export_site(out_dir, workers=1) == 4
+        assert len(os.listdir(out_dir)) == 4
+        with open(os.path.join(out_dir, get_page_filename('a b'))) as file_holder:
+            text = file_holder.read()
+        assert '[Slash]({})'.format(get_page_filename('a/b')) in text
+
+
+def test_page_html():
+    graph = cs.Graph().bulk_load([
+        dict(id='a', title='Topic <A>', info='x & y', child=['b']),
+        dict(id='b', title='B', prereq='a'),
+    ])
+    sink = io.StringIO()
+    graph.get_node('b').get_page().write_html(sink)
+    html = sink.getvalue()
+    assert html.startswith('<!DOCTYPE html>') and html.rstrip().endswith('</html>')
+    assert '<nav>\n<section class="block links" id="parent"><ul>\n' in html
+    assert '<li><a class="link parent" href="a.html">Topic &lt;A&gt;</a></li>' in html
+    assert '<li><a class="link prereq" href="a.html">Topic &lt;A&gt;</a></li>' in html
+    assert '<p>x &amp; y</p>' in ''.join(graph.get_node('a').get_page().get_html())
+
+
+def test_export_site():
+    objects = [dict(id='n{}'.format(i), title='N{}'.format(i), child=['n{}'.format(i // 2)]) for i in range(300)]
+    graph = cs.Graph().bulk_load(objects)
+    with tempfile.TemporaryDirectory() as single_dir, tempfile.TemporaryDirectory() as parallel_dir:
+        assert graph.export_site(single_dir, fmt='html', workers=1) == 300
+        assert graph.export_site(parallel_dir, fmt='html', workers=2) == 300
+        assert sorted(os.listdir(parallel_dir)) == sorted(os.listdir(single_dir))
+        for filename in os.listdir(single_dir):
+            with open(os.path.join(single_dir, filename)) as expected, open(os.path.join(parallel_dir, filename)) as got:
+                assert got.read() == expected.read()
+
+
+def test_incremental_export():
+    graph = cs.Graph().bulk_load([
+        dict(id='a', title='A', child=['b']),
+        dict(id='b', title='B', info='About B'),
+        dict(id='c', title='C', info='About C'),
+        dict(id='d', title='D'),
+    ])
+    with tempfile.TemporaryDirectory() as out_dir:
+        assert graph.export_site(out_dir, workers=1, incremental=True) == 4
+        assert graph.export_site(out_dir, workers=1, incremental=True) == 0
+        fingerprint = graph.get_node('c').get_fingerprint()
+        graph.get_node('c').add_content_item('Edited', cs.BlockType.Info)
+        assert graph.get_node('c').get_fingerprint() != fingerprint
+        assert graph.export_site(out_dir, workers=1, incremental=True) == 1
+        graph.get_node('b').add_title('B2')
+        assert graph.export_site(out_dir, workers=1, incremental=True) == 1  # main title of b is unchanged
+        graph.get_node('b').get_titles().insert(0, 'Renamed B')
+        graph.get_node('b').touch()  # titles list changed in place is reported explicitly
+        assert graph.export_site(out_dir, workers=1, incremental=True) == 2  # b and a showing its title
+        assert graph.get_page_records().get_record_count() == 4
+        graph.get_node('c').add_link_by_type_and_target(cs.LinkType.Uses, 'd')
+        assert graph.get_page_records().get_record_count() == 2  # only pages of changed nodes are fingerprinted again
+        assert graph.export_site(out_dir, workers=1, incremental=True) == 2
+        os.remove(os.path.join(out_dir, 'd.md'))
+        assert graph.export_site(out_dir, workers=1, incremental=True) == 1
+        with open(os.path.join(out_dir, 'a.md')) as file_holder:
+            assert '- [Renamed B](b.md)' in file_holder.read()
+        page = graph.get_node('a').get_page()
+        assert page.get_fingerprint('md') != page.get_fingerprint('html')
+        render_version = pg.RENDER_VERSION
+        pg.RENDER_VERSION += 1
+        try:
+            assert graph.export_site(out_dir, workers=1, incremental=True) == 4  # new renderer outdates all pages
+        finally:
+            pg.RENDER_VERSION = render_version
+
+
+def test_traversal():
+    graph = cs.Graph().bulk_load([
+        dict(id='root', child=['a', 'b']),
+        dict(id='a', child=['a1', 'a2'], prereq='b'),
+        dict(id='a1', child=['root']),  # cycle through parent-child edges
+        dict(id='b'),
+    ])
+    assert graph.get_descendant_names('root') == ['a', 'b', 'a1', 'a2']
+    assert graph.get_descendant_names('root', max_depth=1) == ['a', 'b']
+    assert graph.get_ancestor_names('a2') == ['a', 'root', 'a1']
+    assert graph.get_ancestor_names('a2', max_depth=0) == []
+    dfs = list(graph.get_traversal_iter('root', cs.LinkType.Child, order='dfs', include_start=True))
+    assert dfs == [('root', 0), ('a', 1), ('a1', 2), ('a2', 2), ('b', 1)]
+    assert list(graph.get_traversal_iter(graph.get_node('a'), ['prereq', 'parent'])) == [('b', 1), ('root', 1), ('a1', 2)]
+    assert list(graph.get_traversal_iter('unknown')) == []
+
+
+def test_learning_path():
+    graph = cs.Graph().bulk_load([
+        dict(id='calc', prereq=['algebra', 'trig']),
+        dict(id='algebra', prereq='arith'),
+        dict(id='trig', prereq=['algebra', 'geometry']),
+        dict(id='x', prereq='y'),
+        dict(id='y', prereq='x'),
+        dict(id='z', prereq=['x', 'z']),
+    ])
+    plan = graph.get_prerequisite_plan()
+    assert graph.get_learning_path('calc') == ['arith', 'geometry', 'algebra', 'trig', 'calc']
+    assert graph.get_learning_path('arith') == ['arith']
+    assert plan.get_rank('calc') == 3 and plan.get_rank('geometry') == 0
+    assert sorted(map(sorted, plan.get_cycles())) == [['x', 'y'], ['z']]
+    assert plan.get_prerequisite_names('z') == {'x', 'y', 'z'}
+    order = plan.get_topological_order()
+    assert order.index('algebra') < order.index('trig') < order.index('calc')
+    graph.get_node('arith').add_link_by_type_and_target(cs.LinkType.Prereq, 'counting')
+    assert not plan.is_actual()
+    assert graph.get_learning_path('calc')[:2] == ['counting', 'geometry']
+    graph.drop_edge(('trig', 'geometry', cs.EdgeType.PrereqMore.value))
+    assert 'geometry' not in graph.get_learning_path('calc')
+
+
+def test_reachability_index():
+    graph = cs.Graph().bulk_load([
+        dict(id='science', child=['physics', 'chemistry']),
+        dict(id='physics', child=['optics', 'mechanics']),
+        dict(id='chemistry', child=['photochemistry']),
+        dict(id='optics', child=['photochemistry']),  # second parent
+    ])
+    index = graph.get_reachability_index()
+    assert graph.is_descendant('optics', 'science')
+    assert graph.is_descendant('photochemistry', 'physics')
+    assert graph.is_descendant('photochemistry', 'chemistry')
+    assert not graph.is_descendant('science', 'optics')
+    assert not graph.is_descendant('mechanics', 'chemistry')
+    assert index.get_ancestor_set('photochemistry') == {'optics', 'physics', 'chemistry', 'science'}
+    graph.get_node('mechanics').add_link_by_type_and_target(cs.LinkType.Child, 'statics')
+    assert index.is_actual()  # updated incrementally
+    assert graph.is_descendant('statics', 'science')
+    graph.get_node('chemistry').add_link_by_type_and_target(cs.LinkType.Parent, 'photochemistry')  # cycle
+    assert graph.is_descendant('chemistry', 'chemistry')
+    graph.drop_edge(('chemistry', 'photochemistry', cs.EdgeType.ParentChild.value))
+    graph.drop_edge(('photochemistry', 'optics', cs.EdgeType.ParentChild.value))
+    assert not graph.is_descendant('chemistry', 'chemistry')
+    assert not graph.is_descendant('photochemistry', 'physics')
+    assert index.get_ancestor_set('photochemistry') == set(graph.get_ancestor_names('photochemistry'))
+    chain_size = 3000
+    parent_name = 'mechanics'
+    for n in range(chain_size):  # chain grows incrementally after index was built
+        name = 'step {}'.format(n)
+        cs.Node.build_node_from_dict(dict(id=name, parent=parent_name), graph=graph)
+        assert graph.is_descendant(name, 'physics')
+        parent_name = name
+    assert index.get_extra_ancestor_count() <= index.get_graph().get_node_count()
+    assert graph.is_descendant('step {}'.format(chain_size - 1), 'step 1')
+    assert not graph.is_descendant('step 1', 'step {}'.format(chain_size - 1))
+
+
+def test_search_index():
+    graph = cs.Graph().bulk_load([
+        dict(id='optics', title='Optics', info='Light and lenses', child=[dict(id='lens', caption='Thin lens')]),
+        dict(id='lens', title='Lens', info='A lens focuses light, a lens has focal length'),
+        dict(id='kvant', title='Квантовая механика', info='Основы'),
+        dict(id='sound', title='Acoustics', info='Sound waves'),
+    ])
+    assert [name for name, _ in graph.search('lens')] == ['lens', 'optics']
+    assert graph.search('Квантовая')[0][0] == 'kvant'
+    assert graph.search('kvantovaa')[0][0] == 'kvant'  # transliterated terms
+    assert graph.search('nothing') == []
+    cs.Node.build_node_from_dict(dict(id='sound', info='Echo and lens-free sound'), graph=graph)  # merged
+    cs.Node.build_node_from_dict(dict(id='echo', title='Echo'), graph=graph)
+    assert [name for name, _ in graph.search('echo')] == ['echo', 'sound']
+    assert len(graph.search('lens light', limit=None)) == 3
+    graph.get_node('optics').add_title('Zebra')  # indexed nodes are updated in place
+    assert [name for name, _ in graph.search('zebra')] == ['optics']
+    graph.get_node('kvant').add_content_item('Quasar spectra', block_type=cs.BlockType.Info)
+    assert [name for name, _ in graph.search('quasar')] == ['kvant']
+    graph.get_node('sound').add_content_block(cs.Block(block_type=cs.BlockType.Info, items=['Pulsar timing']))
+    assert [name for name, _ in graph.search('pulsar')] == ['sound']
+    cs.Node.build_node_from_dict(dict(id='alpha', title='First'), graph=graph)
+    assert [name for name, _ in graph.search('first')] == ['alpha']
+    graph.get_node('alpha').set_name('beta', allow_rename=True)  # node without edges
+    assert [name for name, _ in graph.search('first')] == ['beta']
+    index = graph.get_search_index()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'search.index')
+        index.save(path)
+        loaded = cs.Graph().bulk_load([dict(id='lens', title='Lens')])
+        loaded_index = loaded.get_search_index().load(path)
+        assert loaded_index.get_document_count() == 1
+        assert [name for name, _ in loaded.search('focal')] == ['lens']  # text of lens is taken from saved index
+
+
+def test_title_index():
+    graph = cs.Graph().bulk_load([
+        dict(id='thermodynamics', title='Thermodynamics'),
+        dict(id='thermometer', title='Thermometer'),
+        dict(id='optics', title='Optics'),
+        dict(id='kvant', title='Квантовая механика'),
+    ])
+    assert [n.get_name() for n in graph.find_nodes(prefix='Thermo')] == ['thermodynamics', 'thermometer']
+    assert [n.get_name() for n in graph.find_nodes(prefix='thermo', limit=1)] == ['thermodynamics']
+    assert [n.get_name() for n in graph.find_nodes(prefix='квант')] == ['kvant']
+    assert [n.get_name() for n in graph.find_nodes(approx='Termodynamics')] == ['thermodynamics']
+    assert graph.find_nodes(approx='acoustics') == []
+    graph.get_node('optics').add_title('Yak optics')  # title added after index was built
+    assert [n.get_name() for n in graph.find_nodes(prefix='yak')] == ['optics']
+    graph.get_node('kvant').set_name('quantum', allow_rename=True)  # node without edges
+    assert [n.get_name() for n in graph.find_nodes(prefix='quant')] == ['quantum']
+    assert [n.get_name() for n in graph.find_nodes(prefix='квант')] == ['quantum']
+    try:
+        graph.find_nodes(prefix='a', approx='b')
+        raise AssertionError('ValueError expected')
+    except ValueError:
+        pass
+    cs.Node.build_node_from_dict(dict(id='acoustics', title='Acoustics'), graph=graph)
+    assert graph.get_closest_node('Acustics').get_name() == 'acoustics'
+    cs.Node.build_node_from_dict(dict(id='lab', child=['Opticss']), graph=graph)
+    assert graph.get_node('Opticss') is not None  # closest node is not resolved by default
+    graph.set_resolving_closest()
+    cs.Node.build_node_from_dict(dict(id='notes', child=['Optiks', dict(id='Thermometr', caption='T', info='Measures temperature')]), graph=graph)
+    assert [link.get_target_name() for link in graph.get_node('notes').get_all_links_iter()] == ['optics', 'thermometer']
+    assert graph.get_node('Optiks') is None
+    assert graph.get_node('thermometer').get_content_blocks_list()
+    item_count = 200
+    cs.Node.build_node_from_dict(dict(id='topic', child=['item {} of topic'.format(i) for i in range(item_count)]), graph=graph)
+    assert len(list(graph.get_node('topic').get_all_links_iter())) == item_count  # numbered titles stay distinct
+    cs.Node.build_node_from_dict(dict(id='lesson', child=['Item 7 of topik']), graph=graph)
+    assert next(graph.get_node('lesson').get_all_links_iter()).get_target_name() == 'item 7 of topic'
+
+
+def test_thread_safe_graph():
+    graph = cs.Graph(thread_safe=True)
+    errors = list()
+    is_finished = threading.Event()
+
+    def write():
+        for i in range(200):
+            cs.Node.build_node_from_dict(dict(id='p{}'.format(i), child=['c{}'.format(i)]), graph=graph)
+            time.sleep(0)  # readers get the lock between writes
+            cs.Node.build_node_from_dict(dict(id='hub', child=['c{}'.format(i)]), graph=graph)  # merged into hub
+            if i % 10 == 9:
+                with graph.writing():  # both changes are visible at once
+                    graph.drop_edge(('c{}'.format(i), 'p{}'.format(i), cs.EdgeType.ParentChild.value))
+                    time.sleep(0)
+                    graph.rename_item('p{}'.format(i), 'q{}'.format(i))
+        is_finished.set()
+
+    def read():
+        version = -1
+        while not is_finished.is_set():
+            view = graph.get_view()
+            if view.get_version() < version:
+                errors.append((view, version))
+            version = view.get_version()
+            hub = view.get_node('hub')
+            hub_links = list(hub.get_all_links_iter()) if hub else []
+            if len(hub_links) != len(list(view.get_edges_for_node('hub'))):  # node is not changed after view
+                errors.append((view, hub_links))
+            parents = [n for n in view.get_nodes_dict() if n[0] in 'pq']
+            if view.get_edge_count() != len([n for n in parents if n.startswith('p')]) + len(hub_links):
+                errors.append(view)
+            for name in parents:
+                children = view.get_descendant_names(name)
+                if children != (['c' + name[1:]] if name.startswith('p') else []):
+                    errors.append((view, name, children))
+            time.sleep(0)
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    writer = threading.Thread(target=write)
+    for thread in readers + [writer]:
+        thread.start()
+    for thread in readers + [writer]:
+        thread.join()
+    assert not errors, errors[:3]
+    view = graph.get_view()
+    assert view.get_node_count() == 401 and view.get_edge_count() == 380
+    assert view.get_version() == graph.writing().get_version()
+    assert view is graph.get_view()  # view is reused while graph is not changed
+    assert 'q9' in view.get_nodes_dict() and 'p9' not in view.get_nodes_dict()
+    source = cs.Graph().bulk_load([dict(id='s{}'.format(i), child=['s{}'.format(i + 1)]) for i in range(29)])
+    counts = set()
+    is_loaded = threading.Event()
+
+    def read_counts():
+        while not is_loaded.is_set():
+            counts.add(graph.get_view().get_node_count())
+            time.sleep(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'graph.snapshot')
+        source.save_snapshot(path)
+        reader = threading.Thread(target=read_counts)
+        reader.start()
+        for _ in range(20):
+            graph.load_snapshot(path)
+            time.sleep(0)
+        is_loaded.set()
+        reader.join()
+    assert counts <= {401, 30}, counts  # snapshot is loaded in one write
+    try:
+        cs.Graph().get_view()
+        raise AssertionError('ValueError expected')
+    except ValueError:
+        pass
+
+
 if __name__ == '__main__':
     test_create_item()
     test_create_edge()
+    test_get_node_by_title()
+    test_get_edges_for_node()
+    test_get_link()
+    test_snapshot()
+    test_graph_context()
+    test_bulk_load()
+    test_type_synonyms()
+    test_merge_block()
+    test_memory_report()
+    test_columnar_edge_store()
+    test_page_markdown()
+    test_page_filename()
+    test_page_html()
+    test_export_site()
+    test_incremental_export()
+    test_traversal()
+    test_learning_path()
+    test_reachability_index()
+    test_search_index()
+    test_title_index()
+    test_thread_safe_graph()
@@ -1,8 +1,40 @@
 import yaml
-from functools import wraps
-from typing import Optional, Iterable, Union
+import re
+import hashlib
+import html
+from functools import wraps, lru_cache
+from types import MappingProxyType
+from typing import Optional, Callable, Iterable, Generator, Mapping, Union
+from yaml.events import StreamEndEvent, SequenceStartEvent, SequenceEndEvent
+
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+    from yaml.cyaml import CParser
+    from yaml.composer import Composer
+    from yaml.constructor import SafeConstructor
+    from yaml.resolver import Resolver
+
+    class YamlStreamLoader(CParser, Composer, SafeConstructor, Resolver):  # libyaml events, composed record by record
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+except ImportError:  # libyaml is not available, fall back to pure-Python loader
+    from yaml import SafeLoader as YamlSafeLoader
+    YamlStreamLoader = YamlSafeLoader
 
 Array = Union[list, tuple]
+COMPILED_SYNONYMS_TYPES = dict, MappingProxyType
+MIN_ITEMS_FOR_SET = 8  # shorter lists are checked by scan, without allocating a set
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\w.-]+')
+FILENAME_CACHE_SIZE = 1 << 16
+FILENAME_HASH_SIZE = 4
+ESCAPE_CACHE_SIZE = 1 << 16
+TRANSLITERATION_TABLE = str.maketrans(
+    u"абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ",
+    u"abvgdeejzijklmnoprstufhzcss_y_euaABVGDEEJZIJKLMNOPRSTUFHZCSS_Y_EUA",
+)
 
 
 def get_detected_doctype_by_filename(filename: str, default: Optional[str] = None) -> str:
@@ -16,18 +48,82 @@ def get_detected_doctype_by_filename(filename: str, default: Optional[str] = Non
         raise ValueError
 
 
+def transliterate(text):
+    return text.translate(TRANSLITERATION_TABLE)
+
+
+@lru_cache(maxsize=FILENAME_CACHE_SIZE)
+def get_page_filename(name: str, extension: str = 'md') -> str:
+    safe_name = UNSAFE_FILENAME_CHARS.sub('_', name).strip('.') or '_'
+    if safe_name != name:  # hash of original name keeps different names in different files
+        digest = hashlib.blake2b(name.encode('utf-8'), digest_size=FILENAME_HASH_SIZE).hexdigest()
+        safe_name = '{}-{}'.format(safe_name, digest)
+    return '{}.{}'.format(safe_name, extension)
+
+
+@lru_cache(maxsize=ESCAPE_CACHE_SIZE)
+def get_escaped_html(text: str) -> str:
+    return html.escape(text)
+
+
+def get_safe_loaded_yaml(stream):
+    return yaml.load(stream, Loader=YamlSafeLoader)
+
+
+def get_safe_loaded_yaml_iter(stream) -> Generator:
+    loader = YamlStreamLoader(stream)
+    try:
+        loader.get_event()  # StreamStartEvent
+        while not loader.check_event(StreamEndEvent):
+            loader.get_event()  # DocumentStartEvent
+            if loader.check_event(SequenceStartEvent):  # top-level list is yielded item by item
+                loader.get_event()
+                while not loader.check_event(SequenceEndEvent):
+                    yield loader.construct_document(loader.compose_node(None, None))
+                loader.get_event()
+            else:
+                document = loader.construct_document(loader.compose_node(None, None))
+                if document is not None:
+                    yield document
+            loader.get_event()  # DocumentEndEvent
+            loader.anchors = dict()
+    finally:
+        loader.dispose()
+
+
 def get_parsed_yaml_from_lines(self, lines: Iterable):
-    yaml_data = yaml.safe_load(lines)
-    for obj in yaml_data:
+    for obj in get_safe_loaded_yaml_iter(lines):
         assert isinstance(obj, dict)
         self.add_dict_obj(obj)
     return self
 
 
-def get_canonic_synonym(key, synonyms_list: Iterable[Array], skip_missing: bool = False, class_name=None):
+def get_compiled_synonyms(synonyms_list: Iterable[Array], get_value: Optional[Callable] = None) -> Mapping:
+    compiled_synonyms = dict()
     for t in synonyms_list:
-        if key in t:
-            return t[0]
+        canonic = t[0] if get_value is None else get_value(t[0])
+        for key in t:
+            compiled_synonyms.setdefault(key, canonic)
+    return MappingProxyType(compiled_synonyms)
+
+
+def get_canonic_synonym(
+        key,
+        synonyms_list: Union[Iterable[Array], Mapping],
+        skip_missing: bool = False,
+        class_name=None,
+):
+    if isinstance(synonyms_list, COMPILED_SYNONYMS_TYPES):
+        try:
+            canonic = synonyms_list.get(key)
+        except TypeError:  # unhashable key
+            canonic = None
+        if canonic is not None:
+            return canonic
+    else:
+        for t in synonyms_list:
+            if key in t:
+                return t[0]
     if not skip_missing:
         raise ValueError('key {} is not allowed for {} class'.format(key, class_name or ''))
 
@@ -1,13 +1,142 @@
-import yaml
+from typing import Optional, Generator
+import hashlib
+import marshal
+import time
+import os
 
 try:  # Assume we're a submodule in a package.
+    from utils import get_safe_loaded_yaml, get_safe_loaded_yaml_iter
     import classes as cs
 except ImportError:  # Apparently no higher-level package has been imported, fall back to a local import.
+    from .utils import get_safe_loaded_yaml, get_safe_loaded_yaml_iter
     from . import classes as cs
 
+CACHE_VERSION = 2
+CACHE_DIR_VARIABLE = 'SEMADOC_YAML_CACHE'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'semadoc', 'yaml')
+DEFAULT_CACHE_SIZE = 256 << 20
+CACHE_EXTENSION = '.marshal'
+RACY_MTIME_NS = 2 * 10 ** 9  # file changed so recently can change again without changing mtime and size
 
-def get_parsed_yaml(filename: str):
-    stream = open(filename, encoding='utf8', mode='r')
-    parsed_doc = yaml.safe_load(stream)
-    stream.close()
+CACHE_SIZES = dict()  # cache dir -> total size of entries, directory is scanned once per process and on eviction
+
+
+def get_cache_dir(cache_dir: Optional[str] = None) -> str:
+    return cache_dir or os.environ.get(CACHE_DIR_VARIABLE) or DEFAULT_CACHE_DIR
+
+
+def get_cache_path(path: str, cache_dir: str) -> str:
+    key = hashlib.blake2b(path.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, key + CACHE_EXTENSION)
+
+
+def get_content_hash(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def read_cache_entry(cache_path: str, path: str) -> Optional[tuple]:
+    try:
+        with open(cache_path, 'rb') as file_holder:
+            entry = marshal.load(file_holder)  # unlike pickle, marshal does not run code while loading
+    except OSError:  # missing entry
+        return None
+    except (ValueError, EOFError, TypeError):  # corrupted or incompatible entry is parsed again and overwritten
+        return None
+    if isinstance(entry, tuple) and len(entry) == 6 and entry[0] == CACHE_VERSION and entry[1] == path:
+        return entry
+
+
+def get_cache_size(cache_dir: str) -> int:
+    size = CACHE_SIZES.get(cache_dir)
+    if size is None:
+        size = sum(e.stat().st_size for e in os.scandir(cache_dir) if e.name.endswith(CACHE_EXTENSION))
+        CACHE_SIZES[cache_dir] = size
+    return size
+
+
+def get_entry_size(cache_path: str) -> int:
+    try:
+        return os.stat(cache_path).st_size
+    except OSError:  # new entry
+        return 0
+
+
+def write_cache_entry(cache_path: str, entry: tuple, max_cache_size: int):
+    cache_dir = os.path.dirname(cache_path)
+    tmp_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+    try:
+        data = marshal.dumps(entry)
+    except ValueError:  # document has values like dates, that marshal does not support, so it is not cached
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        total_size = get_cache_size(cache_dir) - get_entry_size(cache_path)
+        with open(tmp_path, 'wb') as file_holder:
+            file_holder.write(data)
+        os.replace(tmp_path, cache_path)
+        total_size += len(data)
+        CACHE_SIZES[cache_dir] = total_size
+        if total_size > max_cache_size:
+            evict_cache_entries(cache_dir, max_cache_size)
+    except OSError:  # cache is optional, parsed document is returned anyway
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def evict_cache_entries(cache_dir: str, max_cache_size: int) -> int:
+    entries = list()
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(CACHE_EXTENSION):
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in entries)
+    count = 0
+    for _, size, path in sorted(entries):  # least recently used first
+        if total_size <= max_cache_size:
+            break
+        os.remove(path)
+        total_size -= size
+        count += 1
+    CACHE_SIZES[cache_dir] = total_size
+    return count
+
+
+def touch_cache_entry(cache_path: str):
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+
+
+def get_parsed_yaml(
+        filename: str,
+        use_cache: bool = False,
+        cache_dir: Optional[str] = None,
+        max_cache_size: int = DEFAULT_CACHE_SIZE,
+):
+    if not use_cache:
+        with open(filename, encoding='utf8', mode='r') as stream:
+            return get_safe_loaded_yaml(stream)
+    path = os.path.abspath(filename)
+    cache_path = get_cache_path(path, get_cache_dir(cache_dir))
+    stat = os.stat(path)
+    entry = read_cache_entry(cache_path, path)
+    if entry and entry[2] == stat.st_mtime_ns and entry[3] == stat.st_size:
+        touch_cache_entry(cache_path)
+        return entry[5]
+    with open(path, 'rb') as file_holder:
+        content = file_holder.read()
+    content_hash = get_content_hash(content)
+    if entry and entry[4] == content_hash:
+        parsed_doc = entry[5]
+    else:
+        parsed_doc = get_safe_loaded_yaml(content.decode('utf8'))
+    is_racy = time.time_ns() - stat.st_mtime_ns < RACY_MTIME_NS
+    mtime_ns = None if is_racy else stat.st_mtime_ns  # racy entry is checked by content hash next time
+    write_cache_entry(cache_path, (CACHE_VERSION, path, mtime_ns, stat.st_size, content_hash, parsed_doc), max_cache_size)
     return parsed_doc
+
+
+def get_parsed_yaml_iter(filename: str) -> Generator:
+    with open(filename, encoding='utf8', mode='r') as stream:
+        yield from get_safe_loaded_yaml_iter(stream)